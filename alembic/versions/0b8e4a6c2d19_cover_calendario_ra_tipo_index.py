@@ -0,0 +1,50 @@
+"""cover_calendario_ra_tipo_index
+
+Revision ID: 0b8e4a6c2d19
+Revises: f7c1d8e3a952
+Create Date: 2026-10-16 18:05:44.530127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b8e4a6c2d19'
+down_revision: Union[str, Sequence[str], None] = 'f7c1d8e3a952'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Listagem por tipo: WHERE ra = ? AND id_tipo_data = ? [AND id_data_evento > ?]
+    # ORDER BY id_data_evento. Com o id na chave o seek já sai ordenado, e o
+    # INCLUDE (data_evento) completa as colunas da resposta (index-only scan no
+    # PostgreSQL). Substitui ix_calendario_ra_tipo, que vira prefixo redundante.
+    # (ra, data_evento) já é coberto por uq_calendario_ra_data.
+    op.create_index(
+        'ix_calendario_ra_tipo_id',
+        'calendario',
+        ['ra', 'id_tipo_data', 'id_data_evento'],
+        unique=False,
+        if_not_exists=True,
+        postgresql_include=['data_evento'],
+    )
+    op.drop_index('ix_calendario_ra_tipo', table_name='calendario', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_calendario_ra_tipo',
+        'calendario',
+        ['ra', 'id_tipo_data'],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.drop_index(
+        'ix_calendario_ra_tipo_id', table_name='calendario', if_exists=True
+    )
@@ -0,0 +1,42 @@
+"""Add lookup indexes on usuario, docente and discente
+
+Revision ID: 1159a3214d94
+Revises: 5d2c25fa1361
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1159a3214d94'
+down_revision: Union[str, Sequence[str], None] = '5d2c25fa1361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Índices declarados com index=True em models.py (login e validação de email).
+# A unicidade continua garantida pelas constraints uq_* já existentes;
+# docente.email é propositalmente não-único (ver c18dff1fdb7d).
+INDICES = (
+    ('ix_usuario_ra', 'usuario', ['ra']),
+    ('ix_usuario_email', 'usuario', ['email']),
+    ('ix_usuario_username', 'usuario', ['username']),
+    ('ix_docente_email', 'docente', ['email']),
+    ('ix_discente_email', 'discente', ['email']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela, if_exists=True)
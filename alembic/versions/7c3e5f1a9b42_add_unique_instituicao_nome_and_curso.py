@@ -0,0 +1,34 @@
+"""add_unique_instituicao_nome_and_curso_nome_instituicao
+
+Revision ID: 7c3e5f1a9b42
+Revises: 1159a3214d94
+Create Date: 2026-10-16 11:02:17.524913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5f1a9b42'
+down_revision: Union[str, Sequence[str], None] = '1159a3214d94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Alvos do INSERT ... ON CONFLICT DO NOTHING em obter_ou_criar_*_por_nome.
+    # Falha se já houver nomes duplicados: unificar os registros antes.
+    op.create_unique_constraint('uq_instituicao_nome', 'instituicao', ['nome'])
+    op.create_unique_constraint(
+        'uq_curso_nome_instituicao', 'curso', ['nome', 'id_instituicao']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_curso_nome_instituicao', 'curso', type_='unique')
+    op.drop_constraint('uq_instituicao_nome', 'instituicao', type_='unique')
@@ -0,0 +1,40 @@
+"""add_docente_discente_ra_id_indexes
+
+Revision ID: a3d6f1e8b274
+Revises: 0b8e4a6c2d19
+Create Date: 2026-10-16 19:05:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d6f1e8b274'
+down_revision: Union[str, Sequence[str], None] = '0b8e4a6c2d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Listagens de docentes/discentes por RA: no keyset (WHERE ra = ? AND id > ?
+# ORDER BY id LIMIT n) a página vira um seek em (ra, id), sem sort; o
+# COUNT(*) do RA é respondido só pelo índice. ix_docente_ra/ix_discente_ra
+# continuam atendendo as FKs.
+INDICES = (
+    ('ix_docente_ra_id', 'docente', ['ra', 'id_docente']),
+    ('ix_discente_ra_id', 'discente', ['ra', 'id_discente']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela, if_exists=True)
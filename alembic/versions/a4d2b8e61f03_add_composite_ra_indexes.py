@@ -0,0 +1,40 @@
+"""add_composite_ra_indexes_calendario_horario_nota
+
+Revision ID: a4d2b8e61f03
+Revises: 7c3e5f1a9b42
+Create Date: 2026-10-16 11:48:05.207731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2b8e61f03'
+down_revision: Union[str, Sequence[str], None] = '7c3e5f1a9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Filtros "ra + segunda coluna" usados pelas listagens (por tipo, disciplina,
+# bimestre e dia). horario não é único por dia: há até 4 aulas no mesmo dia.
+INDICES = (
+    ('ix_calendario_ra_tipo', 'calendario', ['ra', 'id_tipo_data']),
+    ('ix_horario_ra_dia', 'horario', ['ra', 'dia_semana']),
+    ('ix_nota_ra_disciplina', 'nota', ['ra', 'disciplina']),
+    ('ix_nota_ra_bimestre', 'nota', ['ra', 'bimestre']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela, if_exists=True)
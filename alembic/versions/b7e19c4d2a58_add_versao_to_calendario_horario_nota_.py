@@ -0,0 +1,37 @@
+"""add_versao_to_calendario_horario_nota_anotacao
+
+Revision ID: b7e19c4d2a58
+Revises: a4d2b8e61f03
+Create Date: 2026-10-16 14:22:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e19c4d2a58'
+down_revision: Union[str, Sequence[str], None] = 'a4d2b8e61f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Contador incrementado a cada UPDATE; base do ETag das listagens por usuário.
+TABELAS = ('calendario', 'horario', 'nota', 'anotacao')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela in TABELAS:
+        op.add_column(
+            tabela,
+            sa.Column('versao', sa.Integer(), nullable=False, server_default='1'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela in reversed(TABELAS):
+        op.drop_column(tabela, 'versao')
@@ -0,0 +1,34 @@
+"""add_unique_calendario_ra_data_evento
+
+Revision ID: d3a6f0b81c27
+Revises: b7e19c4d2a58
+Create Date: 2026-10-16 15:03:12.448930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a6f0b81c27'
+down_revision: Union[str, Sequence[str], None] = 'b7e19c4d2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Alvo do INSERT ... ON CONFLICT (ra, data_evento) em criar_calendario_se_nao_existir.
+# A API já recusava um segundo evento na mesma data, então não há duplicatas.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint(
+        'uq_calendario_ra_data', 'calendario', ['ra', 'data_evento']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_calendario_ra_data', 'calendario', type_='unique')
@@ -0,0 +1,37 @@
+"""add_anotacao_ra_id_index
+
+Revision ID: e5b9c2d47a16
+Revises: d3a6f0b81c27
+Create Date: 2026-10-16 16:21:37.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9c2d47a16'
+down_revision: Union[str, Sequence[str], None] = 'd3a6f0b81c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Listagem de anotações: WHERE ra = ? [AND id_anotacao > ?] ORDER BY
+    # id_anotacao sai do índice já ordenada, sem sort após o filtro. B-tree é
+    # percorrido nos dois sentidos, então não precisa de DESC.
+    op.create_index(
+        'ix_anotacao_ra_id',
+        'anotacao',
+        ['ra', 'id_anotacao'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_anotacao_ra_id', table_name='anotacao', if_exists=True)
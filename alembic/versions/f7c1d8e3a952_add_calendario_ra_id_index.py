@@ -0,0 +1,37 @@
+"""add_calendario_ra_id_index
+
+Revision ID: f7c1d8e3a952
+Revises: e5b9c2d47a16
+Create Date: 2026-10-16 17:48:12.116904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c1d8e3a952'
+down_revision: Union[str, Sequence[str], None] = 'e5b9c2d47a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Paginação keyset do calendário: WHERE ra = ? AND id_data_evento > ?
+    # ORDER BY id_data_evento LIMIT n vira um seek no índice, independente da
+    # profundidade da página (OFFSET percorre e descarta as linhas puladas).
+    op.create_index(
+        'ix_calendario_ra_id',
+        'calendario',
+        ['ra', 'id_data_evento'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_calendario_ra_id', table_name='calendario', if_exists=True)
@@ -1,35 +1,72 @@
+import hashlib
 import jwt
 import os
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
-from dotenv import load_dotenv
 
-from .database import get_db
-from . import crud, models
+from .database import carregar_env, get_db
+from . import constants, crud, models
 
-# Carrega variáveis de ambiente do arquivo .env (se existir)
-load_dotenv()
+# Carrega variáveis de ambiente do arquivo .env (no-op se já carregado)
+carregar_env()
 
 # Configurações JWT (lê do env com fallback para valores padrão)
-SECRET_KEY = os.getenv("SECRET_KEY", "chave_temporaria")
+SECRET_KEY = constants.jwt_secret().decode("utf-8")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Validades em segundos: o exp do JWT é um NumericDate (segundos desde a epoch)
+_ACCESS_TTL_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TTL_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
 security = HTTPBearer()
 
+# Parâmetros de decode montados uma única vez; `require` faz o PyJWT rejeitar
+# tokens sem exp/id_usuario (MissingRequiredClaimError)
+_JWT_DECODE_KW: Dict[str, Any] = {
+    "key": SECRET_KEY,
+    "algorithms": (ALGORITHM,),
+    "options": {"require": ["exp", "id_usuario"]},
+}
+
+
+# Cache de payloads já decodificados (chave: hash do token, nunca o token em si)
+_decode_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+
+def _decode_cached(token: str) -> dict:
+    """Decodifica o JWT reaproveitando payloads válidos já verificados.
+
+    Tokens inválidos não são armazenados: a exceção do PyJWT é propagada.
+    """
+    chave = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _decode_cache.get(chave)
+    if payload is not None:
+        # O cache pode sobreviver alguns segundos ao token; revalida o exp
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            _decode_cache.pop(chave, None)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return payload
+
+    payload = jwt.decode(token, **_JWT_DECODE_KW)
+    _decode_cache[chave] = payload
+    return payload
+
 
 def criar_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria um token JWT com os dados fornecidos."""
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        to_encode["exp"] = int(time.time()) + _ACCESS_TTL_SECONDS
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -37,32 +74,30 @@ def criar_access_token(data: dict, expires_delta: Optional[timedelta] = None) ->
 def criar_refresh_token(data: dict) -> str:
     """Cria um token refresh JWT com expiração longa."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode["exp"] = int(time.time()) + _REFRESH_TTL_SECONDS
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def verificar_token(
-    credentials=Depends(security), db: Session = Depends(get_db)
-) -> models.Usuario:
-    """Verifica o token JWT e retorna o usuário autenticado."""
-    token = credentials.credentials
+def _decodificar_credenciais(credentials) -> dict:
+    """Decodifica o Bearer token, convertendo falhas do JWT em 401."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id_usuario: int = payload.get("id_usuario")
-        if id_usuario is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-            )
+        return _decode_cached(credentials.credentials)
+    except jwt.MissingRequiredClaimError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+        )
     except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
         )
 
-    usuario = crud.obter_usuario(db, id_usuario)
+
+def _obter_usuario_do_payload(db: Session, payload: dict) -> models.Usuario:
+    """Resolve o usuário do id_usuario do token (401 se não existir mais)."""
+    usuario = crud.obter_usuario(db, payload["id_usuario"])
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,19 +106,46 @@ def verificar_token(
     return usuario
 
 
+def verificar_token(
+    credentials=Depends(security), db: Session = Depends(get_db)
+) -> models.Usuario:
+    """Verifica o token JWT e retorna o usuário autenticado."""
+    payload = _decodificar_credenciais(credentials)
+    return _obter_usuario_do_payload(db, payload)
+
+
+def obter_ra_autenticado(
+    credentials=Depends(security), db: Session = Depends(get_db)
+) -> str:
+    """
+    Verifica o token JWT e retorna apenas o RA do usuário autenticado.
+
+    Lê só a coluna `ra` (sem carregar o usuário); o token de um usuário
+    removido recebe 401.
+    """
+    payload = _decodificar_credenciais(credentials)
+    ra = crud.obter_ra_usuario(db, payload["id_usuario"])
+    if ra is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário não encontrado",
+        )
+    return ra
+
+
 def verificar_refresh_token(token: str) -> int:
     """Verifica o refresh token e retorna o id_usuario."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id_usuario: int = payload.get("id_usuario")
-        if id_usuario is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-            )
+        payload = _decode_cached(token)
+    except jwt.MissingRequiredClaimError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+        )
     except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token inválido ou expirado",
         )
+    id_usuario: int = payload["id_usuario"]
     return id_usuario
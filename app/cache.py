@@ -0,0 +1,81 @@
+"""
+Caches em memória compartilhados pela aplicação.
+
+Ficam em um módulo próprio para que `crud` e os routers possam consultá-los
+e invalidá-los sem depender uns dos outros. São por processo: nada que
+decida autenticação fica aqui.
+"""
+
+from collections import Counter
+
+from cachetools import TTLCache
+
+# ============================================================================
+# TIPOS DE DATA
+# ============================================================================
+
+tipos_data_cache: TTLCache = TTLCache(maxsize=32, ttl=3600)
+"""Snapshot de TipoData por id_tipo_data (tabela de domínio, quase estática)"""
+
+
+def invalidar_tipos_data() -> None:
+    """Descarta os tipos de data em cache (chamar após alterar a tabela)."""
+    tipos_data_cache.clear()
+
+
+# ============================================================================
+# ANOTAÇÕES
+# ============================================================================
+
+anotacoes_cache: TTLCache = TTLCache(maxsize=5000, ttl=5)
+"""
+Snapshot das colunas de Anotacao por id_anotacao (usado em GET /{id}).
+
+O cache é por processo e a invalidação só alcança o processo que escreveu;
+o TTL curto limita a poucos segundos o que os demais workers servem defasado.
+"""
+
+
+def invalidar_anotacao(id_anotacao: int) -> None:
+    """Remove o snapshot de uma anotação (chamar após atualizar/deletar)."""
+    anotacoes_cache.pop(id_anotacao, None)
+
+
+def invalidar_anotacoes_do_ra(ra: str) -> None:
+    """Remove os snapshots de todas as anotações do RA (chamar ao deletar o usuário)."""
+    for id_anotacao, snapshot in list(anotacoes_cache.items()):
+        if snapshot["ra"] == ra:
+            anotacoes_cache.pop(id_anotacao, None)
+
+
+# ============================================================================
+# ESTATÍSTICAS
+# ============================================================================
+
+_acessos: Counter = Counter()
+"""Contagem de acessos por (cache, acerto) dos caches de snapshot"""
+
+
+def registrar_acesso(nome: str, acerto: bool) -> None:
+    """Conta um acerto ou uma falta no cache `nome`."""
+    _acessos[nome, acerto] += 1
+
+
+def estatisticas() -> dict:
+    """Acertos, faltas e taxa de acerto de cada cache desde o início do processo."""
+    resultado = {}
+    for nome in sorted({nome for nome, _ in _acessos}):
+        acertos, faltas = _acessos[nome, True], _acessos[nome, False]
+        resultado[nome] = {
+            "acertos": acertos,
+            "faltas": faltas,
+            "taxa_acerto": round(acertos / (acertos + faltas), 4),
+        }
+    return resultado
+
+
+def limpar_caches() -> None:
+    """Esvazia todos os caches em memória (e zera as estatísticas)."""
+    tipos_data_cache.clear()
+    anotacoes_cache.clear()
+    _acessos.clear()
@@ -1,8 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, make_transient_to_detached, selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import date
 import bcrypt
-from . import models, schemas
+from . import cache, constants, models, schemas
 
 
 # ============================================================================
@@ -12,7 +16,7 @@ from . import models, schemas
 
 def hash_senha(senha: str) -> str:
     """Gera hash bcrypt da senha"""
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=constants.BCRYPT_ROUNDS)
     return bcrypt.hashpw(senha.encode("utf-8"), salt).decode("utf-8")
 
 
@@ -21,6 +25,413 @@ def verificar_senha(senha: str, senha_hash: str) -> bool:
     return bcrypt.checkpw(senha.encode("utf-8"), senha_hash.encode("utf-8"))
 
 
+# ============================================================================
+# PAGINAÇÃO
+# ============================================================================
+
+
+def _paginar(
+    query: Query, coluna_id, skip: int, limit: int, after_id: Optional[int]
+) -> list:
+    """
+    Aplica a paginação à query.
+
+    Com `after_id` usa keyset (`WHERE id > after_id ORDER BY id LIMIT n`), cujo
+    custo não cresce com a profundidade da página — caminho preferido.
+    Sem ele, mantém o offset/limit por compatibilidade.
+    """
+    if after_id is not None:
+        return query.filter(coluna_id > after_id).order_by(coluna_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+
+def _colunas_leitura(modelo) -> tuple:
+    """
+    Colunas retornadas pelas listagens (todas, menos o contador interno `versao`).
+
+    Consultar colunas em vez da entidade devolve `Row`s leves, sem montar
+    instâncias ORM nem registrá-las no identity map; os schemas de resposta
+    (from_attributes) leem os atributos do `Row` da mesma forma.
+    """
+    return tuple(
+        coluna for coluna in modelo.__table__.columns if coluna.key != "versao"
+    )
+
+
+# ============================================================================
+# VERSÃO DAS LISTAGENS (ETag)
+# ============================================================================
+
+
+def obter_versao_por_usuario(db: Session, modelo, ra: str) -> Tuple[int, str]:
+    """
+    Retorna `(total, versão)` dos registros do usuário em um único SELECT.
+
+    A versão combina contagem, maior ID e soma de `versao`: muda a cada
+    inserção, remoção ou atualização, então serve de base para o ETag. O total
+    substitui o COUNT que as listagens já faziam.
+    """
+    coluna_id = inspect(modelo).primary_key[0]
+    total, maior_id, soma_versoes = (
+        db.query(func.count(coluna_id), func.max(coluna_id), func.sum(modelo.versao))
+        .filter(modelo.ra == ra)
+        .one()
+    )
+    return total, _formatar_versao(total, maior_id, soma_versoes)
+
+
+def _formatar_versao(total: int, maior_id: Optional[int], soma_versoes) -> str:
+    """Serializa os agregados da versão (mesmo formato nos dois caminhos)."""
+    return f"{total}.{maior_id or 0}.{soma_versoes or 0}"
+
+
+def _paginar_com_janelas(
+    db: Session,
+    colunas: tuple,
+    janelas: tuple,
+    coluna_id,
+    filtros: tuple,
+    skip: int,
+    limit: int,
+) -> list:
+    """
+    Página (offset) de `colunas` acompanhada de agregados de janela (`janelas`).
+
+    Os agregados (`COUNT(*) OVER ()` etc.) cobrem todos os registros que passam
+    em `filtros`, pois são calculados antes do OFFSET/LIMIT.
+    """
+    return (
+        db.query(*colunas, *janelas)
+        .filter(*filtros)
+        .order_by(coluna_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def _paginar_apos(
+    db: Session, colunas: tuple, coluna_id, filtros: tuple, after_id: int, limit: int
+) -> list:
+    """
+    Página keyset (`WHERE id > after_id ORDER BY id LIMIT n`), direto no índice.
+
+    Sem funções de janela: elas obrigariam a ler todos os registros que passam
+    em `filtros` a cada página.
+    """
+    return (
+        db.query(*colunas)
+        .filter(*filtros, coluna_id > after_id)
+        .order_by(coluna_id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _contar(db: Session, coluna_id, filtros: tuple) -> int:
+    """COUNT dos registros que passam em `filtros`."""
+    return db.query(func.count(coluna_id)).filter(*filtros).scalar()
+
+
+def _paginar_com_total(
+    db: Session,
+    colunas: tuple,
+    coluna_id,
+    filtros: tuple,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+) -> Tuple[list, int]:
+    """
+    Página + total de registros que passam em `filtros`.
+
+    No offset é uma única query (total via `COUNT(*) OVER ()`); no keyset o
+    total vem de um COUNT à parte. Página vazia além da primeira também recai
+    no COUNT (o total pode ser > 0).
+    """
+    if after_id is not None:
+        linhas = _paginar_apos(db, colunas, coluna_id, filtros, after_id, limit)
+        return linhas, _contar(db, coluna_id, filtros)
+
+    linhas = _paginar_com_janelas(
+        db,
+        colunas,
+        (func.count().over().label("total_janela"),),
+        coluna_id,
+        filtros,
+        skip,
+        limit,
+    )
+    if linhas:
+        return linhas, linhas[0].total_janela
+    if skip == 0:
+        # Primeira página vazia: não há registro algum
+        return [], 0
+    return [], _contar(db, coluna_id, filtros)
+
+
+def _paginar_com_versao(
+    db: Session,
+    modelo,
+    colunas: tuple,
+    ra: str,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+) -> Tuple[list, int, str]:
+    """
+    Página + `(total, versão)` do usuário.
+
+    No offset os agregados da versão vêm como funções de janela sobre todos os
+    registros do RA, na mesma query. No keyset, e em página vazia além da
+    primeira, vêm de `obter_versao_por_usuario`.
+    """
+    coluna_id = inspect(modelo).primary_key[0]
+    filtros = (modelo.ra == ra,)
+
+    if after_id is not None:
+        linhas = _paginar_apos(db, colunas, coluna_id, filtros, after_id, limit)
+        total, versao = obter_versao_por_usuario(db, modelo, ra)
+        return linhas, total, versao
+
+    janelas = (
+        func.count().over().label("total_janela"),
+        func.max(coluna_id).over().label("maior_id_janela"),
+        func.sum(modelo.versao).over().label("soma_versoes_janela"),
+    )
+    linhas = _paginar_com_janelas(db, colunas, janelas, coluna_id, filtros, skip, limit)
+
+    if not linhas:
+        if skip == 0:
+            return [], 0, _formatar_versao(0, None, None)
+        total, versao = obter_versao_por_usuario(db, modelo, ra)
+        return [], total, versao
+
+    primeira = linhas[0]
+    versao = _formatar_versao(
+        primeira.total_janela, primeira.maior_id_janela, primeira.soma_versoes_janela
+    )
+    return linhas, primeira.total_janela, versao
+
+
+# ============================================================================
+# ATUALIZAÇÃO E REMOÇÃO
+# ============================================================================
+
+
+def _campos_enviados(dados) -> dict:
+    """
+    Campos efetivamente enviados no schema (equivale a model_dump(exclude_unset=True)).
+
+    Lê direto de `model_fields_set`, sem serializar o modelo inteiro.
+    """
+    return {campo: getattr(dados, campo) for campo in dados.model_fields_set}
+
+
+def _atualizar_por_id(
+    db: Session,
+    modelo,
+    coluna_id,
+    id_registro: int,
+    valores: dict,
+    ra: Optional[str] = None,
+):
+    """
+    Atualiza um registro pela PK e retorna a instância atualizada (ou None).
+
+    Em dialetos com UPDATE ... RETURNING (PostgreSQL, SQLite 3.35+) é um único
+    round trip; nos demais mantém o SELECT → setattr → UPDATE. Com `ra`, só
+    atualiza se o registro pertencer a esse RA (None caso contrário).
+    """
+    if not valores:
+        db_registro = db.get(modelo, id_registro)
+        if db_registro is not None and ra is not None and db_registro.ra != ra:
+            return None
+        return db_registro
+
+    if db.get_bind().dialect.update_returning:
+        stmt = update(modelo).where(coluna_id == id_registro)
+        if ra is not None:
+            stmt = stmt.where(modelo.ra == ra)
+        db_registro = db.execute(
+            stmt.values(**valores).returning(modelo)
+        ).scalar_one_or_none()
+        db.commit()
+    else:
+        db_registro = db.get(modelo, id_registro)
+        if db_registro is not None and ra is not None and db_registro.ra != ra:
+            db_registro = None
+        if db_registro:
+            for key, value in valores.items():
+                setattr(db_registro, key, value)
+            db.commit()
+
+    if db_registro is not None:
+        _expirar_relacionamentos_alterados(db, db_registro, valores)
+    return db_registro
+
+
+def _expirar_relacionamentos_alterados(db: Session, db_registro, valores: dict) -> None:
+    """
+    Expira os relacionamentos cuja FK mudou (ex.: `curso` após `id_curso`).
+
+    Com expire_on_commit=False o commit não os recarrega sozinho; sem isso a
+    resposta sairia com o relacionamento antigo já carregado na sessão.
+    """
+    alterados = [
+        rel.key
+        for rel in inspect(db_registro).mapper.relationships
+        if any(coluna.key in valores for coluna in rel.local_columns)
+    ]
+    if alterados:
+        db.expire(db_registro, alterados)
+
+
+def _deletar_por_id(
+    db: Session, coluna_id, id_registro: int, ra: Optional[str] = None
+) -> bool:
+    """
+    Remove um registro pela PK em um único DELETE. Retorna se havia registro.
+
+    Usa DELETE ... RETURNING quando o dialeto suporta; senão, o rowcount.
+    Com `ra`, só remove se o registro pertencer a esse RA.
+    """
+    stmt = delete(coluna_id.class_).where(coluna_id == id_registro)
+    if ra is not None:
+        stmt = stmt.where(coluna_id.class_.ra == ra)
+    if db.get_bind().dialect.delete_returning:
+        removido = db.execute(stmt.returning(coluna_id)).first() is not None
+    else:
+        removido = db.execute(stmt).rowcount > 0
+    db.commit()
+    return removido
+
+
+# ============================================================================
+# VALIDAÇÃO EM UMA QUERY
+# ============================================================================
+
+
+def _obter_dono_e_email_em_uso(
+    db: Session, coluna_id, id_registro: int, email: str
+) -> Tuple[Optional[str], bool]:
+    """
+    RA dono do registro e se `email` já é usado por outro registro da tabela.
+
+    As duas checagens de um PUT (posse e email único) em um só SELECT com
+    subqueries escalares, em vez de buscar o registro e depois o email.
+    """
+    modelo = coluna_id.class_
+    ra_dono = select(modelo.ra).where(coluna_id == id_registro).scalar_subquery()
+    email_em_uso = exists().where(modelo.email == email, coluna_id != id_registro)
+    ra, em_uso = db.execute(select(ra_dono, email_em_uso)).one()
+    return ra, bool(em_uso)
+
+
+def _email_em_uso(
+    db: Session, coluna_id, email: str, id_ignorar: Optional[int] = None
+) -> bool:
+    """
+    Se `email` já é usado na tabela (fora o registro `id_ignorar`).
+
+    `SELECT EXISTS(...)`: para no primeiro match e não carrega o registro.
+    """
+    modelo = coluna_id.class_
+    filtros = [modelo.email == email]
+    if id_ignorar is not None:
+        filtros.append(coluna_id != id_ignorar)
+    return bool(db.scalar(select(exists().where(*filtros))))
+
+
+# ============================================================================
+# CONSULTA COM SNAPSHOT EM CACHE
+# ============================================================================
+
+
+def _obter_com_snapshot(db: Session, modelo, snapshots, id_registro: int):
+    """
+    Obtém um registro pela PK a partir de um snapshot em cache (sem SELECT).
+
+    No acerto a instância é recriada das colunas guardadas e anexada à sessão
+    com `merge(load=False)`; na falta faz o `db.get` e guarda o snapshot.
+    """
+    snapshot = snapshots.get(id_registro)
+    cache.registrar_acesso(modelo.__tablename__, snapshot is not None)
+    if snapshot is not None:
+        registro = modelo(**snapshot)
+        make_transient_to_detached(registro)
+        return db.merge(registro, load=False)
+
+    registro = db.get(modelo, id_registro)
+    if registro is not None:
+        snapshots[id_registro] = {
+            coluna: getattr(registro, coluna)
+            for coluna in modelo.__table__.columns.keys()
+        }
+    return registro
+
+
+# ============================================================================
+# INSERÇÃO EM LOTE
+# ============================================================================
+
+
+def _inserir_em_lote(db: Session, coluna_id, ra: str, itens: list) -> List[int]:
+    """
+    Insere vários registros do usuário (RA) em uma única transação.
+
+    Usa um INSERT com múltiplos VALUES (insertmanyvalues do SQLAlchemy 2.0)
+    e RETURNING da PK; retorna os IDs na ordem dos itens.
+    """
+    if not itens:
+        return []
+    try:
+        ids = db.scalars(
+            insert(coluna_id.class_).returning(coluna_id, sort_by_parameter_order=True),
+            [{**item.model_dump(), "ra": ra} for item in itens],
+        ).all()
+        db.commit()
+        return list(ids)
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+# ============================================================================
+# INSERÇÃO IDEMPOTENTE
+# ============================================================================
+
+# Dialetos com INSERT ... ON CONFLICT DO NOTHING
+_INSERTS_ON_CONFLICT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _inserir_se_nao_existir(db: Session, modelo, valores: dict, colunas_unicas: list):
+    """
+    Insere via INSERT ... ON CONFLICT DO NOTHING RETURNING em um único comando.
+
+    Retorna a instância criada, ou None se outra transação já inseriu a mesma
+    chave. Em dialetos sem ON CONFLICT usa um SAVEPOINT e trata o IntegrityError.
+    """
+    insert = _INSERTS_ON_CONFLICT.get(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = (
+            insert(modelo)
+            .values(**valores)
+            .on_conflict_do_nothing(index_elements=colunas_unicas)
+            .returning(modelo)
+        )
+        return db.scalars(stmt).first()
+
+    try:
+        # SAVEPOINT: uma duplicação não desfaz o restante da transação externa
+        with db.begin_nested():
+            db_registro = modelo(**valores)
+            db.add(db_registro)
+        return db_registro
+    except IntegrityError:
+        return None
+
+
 # ============================================================================
 # INSTITUIÇÃO
 # ============================================================================
@@ -33,39 +444,50 @@ def criar_instituicao(
     db_instituicao = models.Instituicao(**instituicao.model_dump())
     db.add(db_instituicao)
     db.commit()
-    db.refresh(db_instituicao)
     return db_instituicao
 
 
 def obter_instituicao(db: Session, id_instituicao: int) -> Optional[models.Instituicao]:
-    """Obter instituição por ID."""
-    return (
-        db.query(models.Instituicao)
-        .filter(models.Instituicao.id_instituicao == id_instituicao)
-        .first()
-    )
+    """Obter instituição por ID (usa o identity map da sessão)."""
+    return db.get(models.Instituicao, id_instituicao)
 
 
 def obter_instituicoes(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
 ) -> List[models.Instituicao]:
     """Listar todas as instituições com paginação."""
-    return db.query(models.Instituicao).offset(skip).limit(limit).all()
+    return _paginar(
+        db.query(models.Instituicao),
+        models.Instituicao.id_instituicao,
+        skip,
+        limit,
+        after_id,
+    )
 
 
 def obter_ou_criar_instituicao_por_nome(db: Session, nome: str) -> models.Instituicao:
-    """Obter instituição por nome ou criar se não existir."""
-    db_instituicao = (
-        db.query(models.Instituicao).filter(models.Instituicao.nome == nome).first()
+    """Obter instituição por nome ou criar se não existir.
+
+    Não faz commit; o commit fica a cargo de quem chamou.
+    """
+    id_instituicao = (
+        db.query(models.Instituicao.id_instituicao)
+        .filter(models.Instituicao.nome == nome)
+        .limit(1)
+        .scalar()
     )
+    if id_instituicao is not None:
+        return db.get(models.Instituicao, id_instituicao)
 
-    if not db_instituicao:
-        # Criar nova instituição se não existir
-        db_instituicao = models.Instituicao(nome=nome)
-        db.add(db_instituicao)
-        db.commit()
-        db.refresh(db_instituicao)
-
+    # Criar nova instituição se não existir
+    db_instituicao = _inserir_se_nao_existir(
+        db, models.Instituicao, {"nome": nome}, ["nome"]
+    )
+    if db_instituicao is None:
+        # Criada por outra transação entre o SELECT e o INSERT
+        db_instituicao = (
+            db.query(models.Instituicao).filter(models.Instituicao.nome == nome).one()
+        )
     return db_instituicao
 
 
@@ -73,13 +495,13 @@ def atualizar_instituicao(
     db: Session, id_instituicao: int, instituicao: schemas.InstituicaoCreate
 ) -> Optional[models.Instituicao]:
     """Atualizar instituição."""
-    db_instituicao = obter_instituicao(db, id_instituicao)
-    if db_instituicao:
-        for key, value in instituicao.model_dump().items():
-            setattr(db_instituicao, key, value)
-        db.commit()
-        db.refresh(db_instituicao)
-    return db_instituicao
+    return _atualizar_por_id(
+        db,
+        models.Instituicao,
+        models.Instituicao.id_instituicao,
+        id_instituicao,
+        instituicao.model_dump(),
+    )
 
 
 def deletar_instituicao(db: Session, id_instituicao: int) -> bool:
@@ -102,86 +524,86 @@ def criar_curso(db: Session, curso: schemas.CursoCreate) -> models.Curso:
     db_curso = models.Curso(**curso.model_dump())
     db.add(db_curso)
     db.commit()
-    db.refresh(db_curso)
     return db_curso
 
 
 def obter_curso(db: Session, id_curso: int) -> Optional[models.Curso]:
-    """Obter curso por ID."""
-    return db.query(models.Curso).filter(models.Curso.id_curso == id_curso).first()
+    """Obter curso por ID (usa o identity map da sessão)."""
+    return db.get(models.Curso, id_curso)
 
 
-def obter_cursos(db: Session, skip: int = 0, limit: int = 100) -> List[models.Curso]:
+def obter_cursos(
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
+) -> List[models.Curso]:
     """Listar todos os cursos."""
-    return db.query(models.Curso).offset(skip).limit(limit).all()
+    return _paginar(
+        db.query(models.Curso), models.Curso.id_curso, skip, limit, after_id
+    )
 
 
 def obter_cursos_por_instituicao(
-    db: Session, id_instituicao: int, skip: int = 0, limit: int = 100
+    db: Session,
+    id_instituicao: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
 ) -> List[models.Curso]:
     """Listar cursos de uma instituição."""
-    return (
-        db.query(models.Curso)
-        .filter(models.Curso.id_instituicao == id_instituicao)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(models.Curso).filter(models.Curso.id_instituicao == id_instituicao)
+    return _paginar(query, models.Curso.id_curso, skip, limit, after_id)
 
 
 def atualizar_curso(
     db: Session, id_curso: int, curso: schemas.CursoCreate
 ) -> Optional[models.Curso]:
     """Atualizar curso."""
-    db_curso = obter_curso(db, id_curso)
-    if db_curso:
-        for key, value in curso.model_dump().items():
-            setattr(db_curso, key, value)
-        db.commit()
-        db.refresh(db_curso)
-    return db_curso
+    return _atualizar_por_id(
+        db, models.Curso, models.Curso.id_curso, id_curso, curso.model_dump()
+    )
 
 
 def obter_ou_criar_curso_por_nome(
     db: Session, nome_curso: str, id_instituicao: int
 ) -> models.Curso:
-    """Obter curso por nome ou criar se não existir."""
-    try:
-        db_curso = (
-            db.query(models.Curso)
-            .filter(
-                models.Curso.nome == nome_curso,
-                models.Curso.id_instituicao == id_instituicao,
-            )
-            .first()
-        )
+    """Obter curso por nome ou criar se não existir.
 
-        if not db_curso:
-            # Criar novo curso se não existir
-            db_curso = models.Curso(nome=nome_curso, id_instituicao=id_instituicao)
-            db.add(db_curso)
-            db.commit()
-            db.refresh(db_curso)
-
-        return db_curso
-    except IntegrityError:
-        # Se houver erro de integridade (duplicação por race condition), fazer rollback e buscar novamente
-        db.rollback()
-        db_curso = (
-            db.query(models.Curso)
-            .filter(
-                models.Curso.nome == nome_curso,
-                models.Curso.id_instituicao == id_instituicao,
-            )
-            .first()
+    Não faz commit; o commit fica a cargo de quem chamou.
+    """
+    query_id = (
+        db.query(models.Curso.id_curso)
+        .filter(
+            models.Curso.nome == nome_curso,
+            models.Curso.id_instituicao == id_instituicao,
         )
-        return db_curso
+        .limit(1)
+    )
+    id_curso = query_id.scalar()
+    if id_curso is not None:
+        return db.get(models.Curso, id_curso)
+
+    db_curso = _inserir_se_nao_existir(
+        db,
+        models.Curso,
+        {"nome": nome_curso, "id_instituicao": id_instituicao},
+        ["nome", "id_instituicao"],
+    )
+    if db_curso is None:
+        # Duplicação por race condition: buscar o curso criado pela outra transação
+        db_curso = db.get(models.Curso, query_id.scalar())
+
+    return db_curso
 
 
 def deletar_curso(db: Session, id_curso: int) -> bool:
-    """Deletar curso."""
+    """Deletar curso (usuários do curso ficam com id_curso nulo)."""
     db_curso = obter_curso(db, id_curso)
     if db_curso:
+        # Curso.usuarios é lazy="raise": desvincula em um UPDATE, sem carregá-la
+        db.execute(
+            update(models.Usuario)
+            .where(models.Usuario.id_curso == id_curso)
+            .values(id_curso=None)
+        )
         db.delete(db_curso)
         db.commit()
         return True
@@ -192,6 +614,8 @@ def deletar_curso(db: Session, id_curso: int) -> bool:
 # DOCENTE
 # ============================================================================
 
+_COLUNAS_DOCENTE = _colunas_leitura(models.Docente)
+
 
 def criar_docente(db: Session, docente: schemas.DocenteCreate) -> models.Docente:
     """Criar novo docente."""
@@ -199,7 +623,6 @@ def criar_docente(db: Session, docente: schemas.DocenteCreate) -> models.Docente
         db_docente = models.Docente(**docente.model_dump())
         db.add(db_docente)
         db.commit()
-        db.refresh(db_docente)
         return db_docente
     except IntegrityError:
         db.rollback()
@@ -207,10 +630,8 @@ def criar_docente(db: Session, docente: schemas.DocenteCreate) -> models.Docente
 
 
 def obter_docente(db: Session, id_docente: int) -> Optional[models.Docente]:
-    """Obter docente por ID."""
-    return (
-        db.query(models.Docente).filter(models.Docente.id_docente == id_docente).first()
-    )
+    """Obter docente por ID (usa o identity map da sessão)."""
+    return db.get(models.Docente, id_docente)
 
 
 def obter_docente_por_email(db: Session, email: str) -> Optional[models.Docente]:
@@ -218,11 +639,46 @@ def obter_docente_por_email(db: Session, email: str) -> Optional[models.Docente]
     return db.query(models.Docente).filter(models.Docente.email == email).first()
 
 
+def email_docente_em_uso(
+    db: Session, email: str, id_docente_ignorar: Optional[int] = None
+) -> bool:
+    """Se o email já é de um docente (fora `id_docente_ignorar`)."""
+    return _email_em_uso(db, models.Docente.id_docente, email, id_docente_ignorar)
+
+
+def verificar_atualizacao_docente(
+    db: Session, id_docente: int, email: str
+) -> Tuple[Optional[str], bool]:
+    """RA dono do docente (None se não existir) e se o email é de outro docente."""
+    return _obter_dono_e_email_em_uso(db, models.Docente.id_docente, id_docente, email)
+
+
 def obter_docentes(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
 ) -> List[models.Docente]:
     """Listar todos os docentes."""
-    return db.query(models.Docente).offset(skip).limit(limit).all()
+    return _paginar(
+        db.query(models.Docente), models.Docente.id_docente, skip, limit, after_id
+    )
+
+
+def obter_docentes_por_usuario_com_total(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int]:
+    """Listar docentes do usuário (linhas somente leitura) junto com o total."""
+    return _paginar_com_total(
+        db,
+        _COLUNAS_DOCENTE,
+        models.Docente.id_docente,
+        (models.Docente.ra == ra,),
+        skip,
+        limit,
+        after_id,
+    )
 
 
 def atualizar_docente(
@@ -230,13 +686,13 @@ def atualizar_docente(
 ) -> Optional[models.Docente]:
     """Atualizar docente."""
     try:
-        db_docente = obter_docente(db, id_docente)
-        if db_docente:
-            for key, value in docente.model_dump().items():
-                setattr(db_docente, key, value)
-            db.commit()
-            db.refresh(db_docente)
-        return db_docente
+        return _atualizar_por_id(
+            db,
+            models.Docente,
+            models.Docente.id_docente,
+            id_docente,
+            docente.model_dump(),
+        )
     except IntegrityError:
         db.rollback()
         raise
@@ -257,13 +713,15 @@ def deletar_docente(db: Session, id_docente: int) -> bool:
 # ============================================================================
 
 
+_COLUNAS_DISCENTE = _colunas_leitura(models.Discente)
+
+
 def criar_discente(db: Session, discente: schemas.DiscenteCreate) -> models.Discente:
     """Criar novo discente."""
     try:
         db_discente = models.Discente(**discente.model_dump())
         db.add(db_discente)
         db.commit()
-        db.refresh(db_discente)
         return db_discente
     except IntegrityError:
         db.rollback()
@@ -271,12 +729,8 @@ def criar_discente(db: Session, discente: schemas.DiscenteCreate) -> models.Disc
 
 
 def obter_discente(db: Session, id_discente: int) -> Optional[models.Discente]:
-    """Obter discente por ID."""
-    return (
-        db.query(models.Discente)
-        .filter(models.Discente.id_discente == id_discente)
-        .first()
-    )
+    """Obter discente por ID (usa o identity map da sessão)."""
+    return db.get(models.Discente, id_discente)
 
 
 def obter_discente_por_email(db: Session, email: str) -> Optional[models.Discente]:
@@ -284,24 +738,60 @@ def obter_discente_por_email(db: Session, email: str) -> Optional[models.Discent
     return db.query(models.Discente).filter(models.Discente.email == email).first()
 
 
+def email_discente_em_uso(
+    db: Session, email: str, id_discente_ignorar: Optional[int] = None
+) -> bool:
+    """Se o email já é de um discente (fora `id_discente_ignorar`)."""
+    return _email_em_uso(db, models.Discente.id_discente, email, id_discente_ignorar)
+
+
+def verificar_atualizacao_discente(
+    db: Session, id_discente: int, email: str
+) -> Tuple[Optional[str], bool]:
+    """RA dono do discente (None se não existir) e se o email é de outro discente."""
+    return _obter_dono_e_email_em_uso(
+        db, models.Discente.id_discente, id_discente, email
+    )
+
+
 def obter_discentes(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
 ) -> List[models.Discente]:
     """Listar todos os discentes."""
-    return db.query(models.Discente).offset(skip).limit(limit).all()
+    return _paginar(
+        db.query(models.Discente), models.Discente.id_discente, skip, limit, after_id
+    )
+
+
+def obter_discentes_por_usuario_com_total(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int]:
+    """Listar discentes do usuário (linhas somente leitura) junto com o total."""
+    return _paginar_com_total(
+        db,
+        _COLUNAS_DISCENTE,
+        models.Discente.id_discente,
+        (models.Discente.ra == ra,),
+        skip,
+        limit,
+        after_id,
+    )
 
 
 def obter_discentes_por_curso(
-    db: Session, id_curso: int, skip: int = 0, limit: int = 100
+    db: Session,
+    id_curso: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
 ) -> List[models.Discente]:
     """Listar discentes de um curso."""
-    return (
-        db.query(models.Discente)
-        .filter(models.Discente.id_curso == id_curso)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(models.Discente).filter(models.Discente.id_curso == id_curso)
+    return _paginar(query, models.Discente.id_discente, skip, limit, after_id)
 
 
 def atualizar_discente(
@@ -309,13 +799,13 @@ def atualizar_discente(
 ) -> Optional[models.Discente]:
     """Atualizar discente."""
     try:
-        db_discente = obter_discente(db, id_discente)
-        if db_discente:
-            for key, value in discente.model_dump().items():
-                setattr(db_discente, key, value)
-            db.commit()
-            db.refresh(db_discente)
-        return db_discente
+        return _atualizar_por_id(
+            db,
+            models.Discente,
+            models.Discente.id_discente,
+            id_discente,
+            discente.model_dump(),
+        )
     except IntegrityError:
         db.rollback()
         raise
@@ -326,14 +816,14 @@ def atualizar_discente_parcial(
 ) -> Optional[models.Discente]:
     """Atualizar discente (apenas campos fornecidos - PATCH)."""
     try:
-        db_discente = obter_discente(db, id_discente)
-        if db_discente:
-            # Atualizar apenas campos não-nulos
-            for key, value in discente.model_dump(exclude_unset=True).items():
-                setattr(db_discente, key, value)
-            db.commit()
-            db.refresh(db_discente)
-        return db_discente
+        # Atualizar apenas campos não-nulos
+        return _atualizar_por_id(
+            db,
+            models.Discente,
+            models.Discente.id_discente,
+            id_discente,
+            _campos_enviados(discente),
+        )
     except IntegrityError:
         db.rollback()
         raise
@@ -373,23 +863,47 @@ def criar_usuario(db: Session, usuario: schemas.UsuarioCreate) -> models.Usuario
         db_usuario = models.Usuario(**usuario_data)
         db.add(db_usuario)
         db.commit()
-        db.refresh(db_usuario)
         return db_usuario
     except IntegrityError:
         db.rollback()
         raise
 
 
+# Relacionamentos lidos pelas respostas de usuário (nome_instituicao/nome_curso);
+# selectinload evita um SELECT lazy por usuário nas listagens
+_CARREGAR_INSTITUICAO_CURSO = (
+    selectinload(models.Usuario.instituicao),
+    selectinload(models.Usuario.curso),
+)
+
+
+def _query_usuarios_completos(db: Session) -> Query:
+    """Query de usuários já carregando instituição e curso."""
+    return db.query(models.Usuario).options(*_CARREGAR_INSTITUICAO_CURSO)
+
+
 def obter_usuario(db: Session, id_usuario: int) -> Optional[models.Usuario]:
-    """Obter usuário por ID."""
+    """Obter usuário por ID (usa o identity map da sessão)."""
+    return db.get(models.Usuario, id_usuario)
+
+
+def obter_ra_usuario(db: Session, id_usuario: int) -> Optional[str]:
+    """Obter apenas o RA do usuário (None se ele não existir)."""
     return (
-        db.query(models.Usuario).filter(models.Usuario.id_usuario == id_usuario).first()
+        db.query(models.Usuario.ra)
+        .filter(models.Usuario.id_usuario == id_usuario)
+        .scalar()
     )
 
 
+def obter_usuario_completo(db: Session, id_usuario: int) -> Optional[models.Usuario]:
+    """Obter usuário por ID com instituição e curso carregados."""
+    return db.get(models.Usuario, id_usuario, options=list(_CARREGAR_INSTITUICAO_CURSO))
+
+
 def obter_usuario_por_ra(db: Session, ra: str) -> Optional[models.Usuario]:
-    """Obter usuário por RA."""
-    return db.query(models.Usuario).filter(models.Usuario.ra == ra).first()
+    """Obter usuário por RA (com instituição e curso carregados)."""
+    return _query_usuarios_completos(db).filter(models.Usuario.ra == ra).first()
 
 
 def obter_usuario_por_email(db: Session, email: str) -> Optional[models.Usuario]:
@@ -403,36 +917,38 @@ def obter_usuario_por_username(db: Session, username: str) -> Optional[models.Us
 
 
 def obter_usuarios(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
 ) -> List[models.Usuario]:
     """Listar todos os usuários."""
-    return db.query(models.Usuario).offset(skip).limit(limit).all()
+    return _paginar(
+        _query_usuarios_completos(db), models.Usuario.id_usuario, skip, limit, after_id
+    )
 
 
 def obter_usuarios_por_instituicao(
-    db: Session, id_instituicao: int, skip: int = 0, limit: int = 100
+    db: Session,
+    id_instituicao: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
 ) -> List[models.Usuario]:
     """Listar usuários de uma instituição."""
-    return (
-        db.query(models.Usuario)
-        .filter(models.Usuario.id_instituicao == id_instituicao)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = _query_usuarios_completos(db).filter(
+        models.Usuario.id_instituicao == id_instituicao
     )
+    return _paginar(query, models.Usuario.id_usuario, skip, limit, after_id)
 
 
 def obter_usuarios_por_curso(
-    db: Session, id_curso: int, skip: int = 0, limit: int = 100
+    db: Session,
+    id_curso: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
 ) -> List[models.Usuario]:
     """Listar usuários de um curso."""
-    return (
-        db.query(models.Usuario)
-        .filter(models.Usuario.id_curso == id_curso)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = _query_usuarios_completos(db).filter(models.Usuario.id_curso == id_curso)
+    return _paginar(query, models.Usuario.id_usuario, skip, limit, after_id)
 
 
 def atualizar_usuario(
@@ -440,33 +956,31 @@ def atualizar_usuario(
 ) -> Optional[models.Usuario]:
     """Atualizar usuário (apenas campos fornecidos)."""
     try:
-        db_usuario = obter_usuario(db, id_usuario)
-        if db_usuario:
-            # Atualizar apenas campos não-nulos
-            dados_atualizacao = usuario.model_dump(exclude_unset=True)
-
-            # Se nome_curso foi fornecido, resolver para id_curso
-            if "nome_curso" in dados_atualizacao and dados_atualizacao["nome_curso"]:
-                id_instituicao: int = db_usuario.id_instituicao
-                db_curso = obter_ou_criar_curso_por_nome(
-                    db, dados_atualizacao["nome_curso"], id_instituicao
-                )
-                dados_atualizacao["id_curso"] = db_curso.id_curso
-                del dados_atualizacao["nome_curso"]
-            else:
-                # Remover nome_curso se não foi fornecido
-                dados_atualizacao.pop("nome_curso", None)
-
-            # Se senha foi fornecida, fazer hash
-            if "senha_hash" in dados_atualizacao and dados_atualizacao["senha_hash"]:
-                dados_atualizacao["senha_hash"] = hash_senha(
-                    dados_atualizacao["senha_hash"]
-                )
-
-            for key, value in dados_atualizacao.items():
-                setattr(db_usuario, key, value)
-            db.commit()
-            db.refresh(db_usuario)
+        # Atualizar apenas campos não-nulos
+        dados_atualizacao = usuario.model_dump(exclude_unset=True)
+        nome_curso = dados_atualizacao.pop("nome_curso", None)
+
+        # Se nome_curso foi fornecido, resolver para id_curso
+        if nome_curso:
+            id_instituicao = (
+                db.query(models.Usuario.id_instituicao)
+                .filter(models.Usuario.id_usuario == id_usuario)
+                .scalar()
+            )
+            if id_instituicao is None:
+                return None
+            db_curso = obter_ou_criar_curso_por_nome(db, nome_curso, id_instituicao)
+            dados_atualizacao["id_curso"] = db_curso.id_curso
+
+        # Se senha foi fornecida, fazer hash (só quando o campo é enviado)
+        if dados_atualizacao.get("senha_hash"):
+            dados_atualizacao["senha_hash"] = hash_senha(
+                dados_atualizacao["senha_hash"]
+            )
+
+        db_usuario = _atualizar_por_id(
+            db, models.Usuario, models.Usuario.id_usuario, id_usuario, dados_atualizacao
+        )
         return db_usuario
     except IntegrityError:
         db.rollback()
@@ -479,6 +993,8 @@ def deletar_usuario(db: Session, id_usuario: int) -> bool:
     if db_usuario:
         db.delete(db_usuario)
         db.commit()
+        # As anotações saem em cascata; os snapshots em cache não
+        cache.invalidar_anotacoes_do_ra(db_usuario.ra)
         return True
     return False
 
@@ -487,6 +1003,8 @@ def deletar_usuario(db: Session, id_usuario: int) -> bool:
 # CALENDÁRIO
 # ============================================================================
 
+_COLUNAS_CALENDARIO = _colunas_leitura(models.Calendario)
+
 
 def criar_calendario(
     db: Session, calendario: schemas.CalendarioCreate
@@ -496,107 +1014,204 @@ def criar_calendario(
         db_calendario = models.Calendario(**calendario.model_dump())
         db.add(db_calendario)
         db.commit()
-        db.refresh(db_calendario)
         return db_calendario
     except IntegrityError:
         db.rollback()
         raise
 
 
+def criar_calendario_se_nao_existir(
+    db: Session, ra: str, calendario: schemas.CalendarioCreate
+) -> Optional[models.Calendario]:
+    """
+    Criar evento do usuário (RA) se ainda não houver um na mesma data.
+
+    Um único INSERT ... ON CONFLICT (ra, data_evento) DO NOTHING: retorna None
+    em caso de duplicata, sem SELECT prévio nem INSERT abortado + ROLLBACK.
+    """
+    db_calendario = _inserir_se_nao_existir(
+        db,
+        models.Calendario,
+        {**calendario.model_dump(), "ra": ra},
+        ["ra", "data_evento"],
+    )
+    if db_calendario is not None:
+        db.commit()
+    return db_calendario
+
+
 def obter_tipo_data(db: Session, id_tipo_data: int) -> Optional[models.TipoData]:
-    """Obter tipo de data por ID."""
-    return (
-        db.query(models.TipoData)
-        .filter(models.TipoData.id_tipo_data == id_tipo_data)
-        .first()
+    """
+    Obter tipo de data por ID.
+
+    A tabela é praticamente estática (Falta, Não Letivo, Letivo), então o
+    snapshot fica em `cache.tipos_data_cache` e só a primeira consulta vai ao banco.
+    """
+    return _obter_com_snapshot(
+        db, models.TipoData, cache.tipos_data_cache, id_tipo_data
     )
 
 
 def obter_calendario(db: Session, id_data_evento: int) -> Optional[models.Calendario]:
-    """Obter evento de calendário por ID."""
+    """Obter evento de calendário por ID (usa o identity map da sessão)."""
+    return db.get(models.Calendario, id_data_evento)
+
+
+def obter_linha_calendario(db: Session, id_data_evento: int) -> Optional[Row]:
+    """Obter evento por ID só com as colunas de leitura (Row, sem montar o modelo)."""
     return (
-        db.query(models.Calendario)
+        db.query(*_COLUNAS_CALENDARIO)
         .filter(models.Calendario.id_data_evento == id_data_evento)
         .first()
     )
 
 
-def obter_calendarios_por_usuario(
-    db: Session, ra: str, skip: int = 0, limit: int = 100
-) -> List[models.Calendario]:
-    """Listar eventos de calendário do usuário."""
+def obter_linha_calendario_por_data(
+    db: Session, ra: str, data_evento: date
+) -> Optional[Row]:
+    """Obter o evento do usuário (RA) em uma data, só com as colunas de leitura."""
     return (
-        db.query(models.Calendario)
-        .filter(models.Calendario.ra == ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        db.query(*_COLUNAS_CALENDARIO)
+        .filter(
+            models.Calendario.ra == ra, models.Calendario.data_evento == data_evento
+        )
+        .first()
     )
 
 
-def obter_calendarios_por_tipo(
-    db: Session, ra: str, id_tipo_data: int, skip: int = 0, limit: int = 100
-) -> List[models.Calendario]:
-    """Listar eventos de calendário por tipo."""
+def obter_ra_calendario(db: Session, id_data_evento: int) -> Optional[str]:
+    """Obter apenas o RA dono do evento (None se ele não existir)."""
     return (
-        db.query(models.Calendario)
-        .filter(
-            models.Calendario.ra == ra, models.Calendario.id_tipo_data == id_tipo_data
-        )
-        .offset(skip)
-        .limit(limit)
-        .all()
+        db.query(models.Calendario.ra)
+        .filter(models.Calendario.id_data_evento == id_data_evento)
+        .scalar()
+    )
+
+
+def obter_calendarios_por_usuario(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar eventos de calendário do usuário (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_CALENDARIO).filter(models.Calendario.ra == ra)
+    return _paginar(query, models.Calendario.id_data_evento, skip, limit, after_id)
+
+
+def obter_calendarios_por_tipo(
+    db: Session,
+    ra: str,
+    id_tipo_data: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar eventos de calendário por tipo (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_CALENDARIO).filter(
+        models.Calendario.ra == ra, models.Calendario.id_tipo_data == id_tipo_data
+    )
+    return _paginar(query, models.Calendario.id_data_evento, skip, limit, after_id)
+
+
+def obter_calendarios_por_usuario_com_versao(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int, str]:
+    """Listar eventos de calendário do usuário junto com `(total, versão)`."""
+    return _paginar_com_versao(
+        db, models.Calendario, _COLUNAS_CALENDARIO, ra, skip, limit, after_id
+    )
+
+
+def obter_calendarios_por_tipo_com_total(
+    db: Session,
+    ra: str,
+    id_tipo_data: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int]:
+    """Listar eventos de calendário por tipo junto com o total, em uma query."""
+    return _paginar_com_total(
+        db,
+        _COLUNAS_CALENDARIO,
+        models.Calendario.id_data_evento,
+        (models.Calendario.ra == ra, models.Calendario.id_tipo_data == id_tipo_data),
+        skip,
+        limit,
+        after_id,
     )
 
 
 def atualizar_calendario(
-    db: Session, id_data_evento: int, calendario: schemas.CalendarioCreate
+    db: Session,
+    id_data_evento: int,
+    calendario: schemas.CalendarioCreate,
+    ra: Optional[str] = None,
 ) -> Optional[models.Calendario]:
-    """Atualizar evento de calendário."""
+    """Atualizar evento de calendário (com `ra`, só se pertencer a esse RA)."""
     try:
-        db_calendario = obter_calendario(db, id_data_evento)
-        if db_calendario:
-            for key, value in calendario.model_dump().items():
-                setattr(db_calendario, key, value)
-            db.commit()
-            db.refresh(db_calendario)
-        return db_calendario
+        return _atualizar_por_id(
+            db,
+            models.Calendario,
+            models.Calendario.id_data_evento,
+            id_data_evento,
+            calendario.model_dump(),
+            ra=ra,
+        )
     except IntegrityError:
         db.rollback()
         raise
 
 
 def atualizar_calendario_parcial(
-    db: Session, id_data_evento: int, calendario: schemas.CalendarioUpdate
+    db: Session,
+    id_data_evento: int,
+    calendario: schemas.CalendarioUpdate,
+    ra: Optional[str] = None,
 ) -> Optional[models.Calendario]:
-    """Atualizar evento de calendário (apenas campos fornecidos)."""
+    """
+    Atualizar evento de calendário (apenas campos fornecidos).
+
+    Campos enviados como null são ignorados: as colunas são NOT NULL.
+    """
+    valores = {
+        campo: valor
+        for campo, valor in _campos_enviados(calendario).items()
+        if valor is not None
+    }
     try:
-        db_calendario = obter_calendario(db, id_data_evento)
-        if db_calendario:
-            for key, value in calendario.model_dump(exclude_unset=True).items():
-                setattr(db_calendario, key, value)
-            db.commit()
-            db.refresh(db_calendario)
-        return db_calendario
+        return _atualizar_por_id(
+            db,
+            models.Calendario,
+            models.Calendario.id_data_evento,
+            id_data_evento,
+            valores,
+            ra=ra,
+        )
     except IntegrityError:
         db.rollback()
         raise
 
 
-def deletar_calendario(db: Session, id_data_evento: int) -> bool:
-    """Deletar evento de calendário."""
-    db_calendario = obter_calendario(db, id_data_evento)
-    if db_calendario:
-        db.delete(db_calendario)
-        db.commit()
-        return True
-    return False
+def deletar_calendario(
+    db: Session, id_data_evento: int, ra: Optional[str] = None
+) -> bool:
+    """Deletar evento de calendário (com `ra`, só se pertencer a esse RA)."""
+    return _deletar_por_id(db, models.Calendario.id_data_evento, id_data_evento, ra)
 
 
 # ============================================================================
 # HORÁRIO
 # ============================================================================
 
+_COLUNAS_HORARIO = _colunas_leitura(models.Horario)
+
 
 def criar_horario(db: Session, horario: schemas.HorarioCreate) -> models.Horario:
     """Criar novo horário."""
@@ -604,7 +1219,6 @@ def criar_horario(db: Session, horario: schemas.HorarioCreate) -> models.Horario
         db_horario = models.Horario(**horario.model_dump())
         db.add(db_horario)
         db.commit()
-        db.refresh(db_horario)
         return db_horario
     except IntegrityError:
         db.rollback()
@@ -612,22 +1226,61 @@ def criar_horario(db: Session, horario: schemas.HorarioCreate) -> models.Horario
 
 
 def obter_horario(db: Session, id_horario: int) -> Optional[models.Horario]:
-    """Obter horário por ID."""
+    """Obter horário por ID (usa o identity map da sessão)."""
+    return db.get(models.Horario, id_horario)
+
+
+def obter_ra_horario(db: Session, id_horario: int) -> Optional[str]:
+    """Obter apenas o RA dono do horário (None se ele não existir)."""
     return (
-        db.query(models.Horario).filter(models.Horario.id_horario == id_horario).first()
+        db.query(models.Horario.ra)
+        .filter(models.Horario.id_horario == id_horario)
+        .scalar()
     )
 
 
 def obter_horarios_por_usuario(
-    db: Session, ra: str, skip: int = 0, limit: int = 100
-) -> List[models.Horario]:
-    """Listar horários do usuário."""
-    return (
-        db.query(models.Horario)
-        .filter(models.Horario.ra == ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar horários do usuário (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_HORARIO).filter(models.Horario.ra == ra)
+    return _paginar(query, models.Horario.id_horario, skip, limit, after_id)
+
+
+def obter_horarios_por_usuario_com_versao(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int, str]:
+    """Listar horários do usuário junto com `(total, versão)`, em uma query."""
+    return _paginar_com_versao(
+        db, models.Horario, _COLUNAS_HORARIO, ra, skip, limit, after_id
+    )
+
+
+def obter_horarios_por_dia_com_total(
+    db: Session,
+    ra: str,
+    dia_semana: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int]:
+    """Listar horários do usuário em um dia junto com o total, em uma query."""
+    return _paginar_com_total(
+        db,
+        _COLUNAS_HORARIO,
+        models.Horario.id_horario,
+        (models.Horario.ra == ra, models.Horario.dia_semana == dia_semana),
+        skip,
+        limit,
+        after_id,
     )
 
 
@@ -647,32 +1300,46 @@ def atualizar_horario(
 ) -> Optional[models.Horario]:
     """Atualizar horário."""
     try:
-        db_horario = obter_horario(db, id_horario)
-        if db_horario:
-            for key, value in horario.model_dump().items():
-                setattr(db_horario, key, value)
-            db.commit()
-            db.refresh(db_horario)
-        return db_horario
+        return _atualizar_por_id(
+            db,
+            models.Horario,
+            models.Horario.id_horario,
+            id_horario,
+            horario.model_dump(),
+        )
     except IntegrityError:
         db.rollback()
         raise
 
 
-def deletar_horario(db: Session, id_horario: int) -> bool:
-    """Deletar horário."""
-    db_horario = obter_horario(db, id_horario)
-    if db_horario:
-        db.delete(db_horario)
-        db.commit()
-        return True
-    return False
+def atualizar_horario_parcial(
+    db: Session,
+    id_horario: int,
+    horario: schemas.HorarioUpdate,
+    ra: Optional[str] = None,
+) -> Optional[models.Horario]:
+    """Atualizar horário (apenas campos fornecidos e não nulos) em um UPDATE."""
+    valores = {c: v for c, v in _campos_enviados(horario).items() if v is not None}
+    try:
+        return _atualizar_por_id(
+            db, models.Horario, models.Horario.id_horario, id_horario, valores, ra=ra
+        )
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+def deletar_horario(db: Session, id_horario: int, ra: Optional[str] = None) -> bool:
+    """Deletar horário (com `ra`, só se pertencer a esse RA)."""
+    return _deletar_por_id(db, models.Horario.id_horario, id_horario, ra)
 
 
 # ============================================================================
 # NOTA
 # ============================================================================
 
+_COLUNAS_NOTA = _colunas_leitura(models.Nota)
+
 
 def criar_nota(db: Session, nota: schemas.NotaCreate) -> models.Nota:
     """Criar nova nota."""
@@ -680,7 +1347,6 @@ def criar_nota(db: Session, nota: schemas.NotaCreate) -> models.Nota:
         db_nota = models.Nota(**nota.model_dump())
         db.add(db_nota)
         db.commit()
-        db.refresh(db_nota)
         return db_nota
     except IntegrityError:
         db.rollback()
@@ -688,47 +1354,68 @@ def criar_nota(db: Session, nota: schemas.NotaCreate) -> models.Nota:
 
 
 def obter_nota(db: Session, id_nota: int) -> Optional[models.Nota]:
-    """Obter nota por ID."""
-    return db.query(models.Nota).filter(models.Nota.id_nota == id_nota).first()
+    """Obter nota por ID (usa o identity map da sessão)."""
+    return db.get(models.Nota, id_nota)
+
+
+def obter_ra_nota(db: Session, id_nota: int) -> Optional[str]:
+    """Obter apenas o RA dono da nota (None se ela não existir)."""
+    return db.query(models.Nota.ra).filter(models.Nota.id_nota == id_nota).scalar()
 
 
 def obter_notas_por_usuario(
-    db: Session, ra: str, skip: int = 0, limit: int = 100
-) -> List[models.Nota]:
-    """Listar notas do usuário."""
-    return (
-        db.query(models.Nota)
-        .filter(models.Nota.ra == ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar notas do usuário (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_NOTA).filter(models.Nota.ra == ra)
+    return _paginar(query, models.Nota.id_nota, skip, limit, after_id)
+
+
+def obter_notas_por_usuario_com_versao(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int, str]:
+    """Listar notas do usuário junto com `(total, versão)`, em uma query."""
+    return _paginar_com_versao(
+        db, models.Nota, _COLUNAS_NOTA, ra, skip, limit, after_id
     )
 
 
 def obter_notas_por_disciplina(
-    db: Session, ra: str, id_disciplina: int, skip: int = 0, limit: int = 100
-) -> List[models.Nota]:
-    """Listar notas de uma disciplina."""
-    return (
-        db.query(models.Nota)
-        .filter(models.Nota.ra == ra, models.Nota.id_disciplina == id_disciplina)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    db: Session,
+    ra: str,
+    disciplina: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar notas de uma disciplina (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_NOTA).filter(
+        models.Nota.ra == ra, models.Nota.disciplina == disciplina
     )
+    return _paginar(query, models.Nota.id_nota, skip, limit, after_id)
 
 
 def obter_notas_por_bimestre(
-    db: Session, ra: str, bimestre: int, skip: int = 0, limit: int = 100
-) -> List[models.Nota]:
-    """Listar notas de um bimestre."""
-    return (
-        db.query(models.Nota)
-        .filter(models.Nota.ra == ra, models.Nota.bimestre == bimestre)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    db: Session,
+    ra: str,
+    bimestre: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar notas de um bimestre (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_NOTA).filter(
+        models.Nota.ra == ra, models.Nota.bimestre == bimestre
     )
+    return _paginar(query, models.Nota.id_nota, skip, limit, after_id)
 
 
 def atualizar_nota(
@@ -736,32 +1423,39 @@ def atualizar_nota(
 ) -> Optional[models.Nota]:
     """Atualizar nota."""
     try:
-        db_nota = obter_nota(db, id_nota)
-        if db_nota:
-            for key, value in nota.model_dump().items():
-                setattr(db_nota, key, value)
-            db.commit()
-            db.refresh(db_nota)
-        return db_nota
+        return _atualizar_por_id(
+            db, models.Nota, models.Nota.id_nota, id_nota, nota.model_dump()
+        )
     except IntegrityError:
         db.rollback()
         raise
 
 
-def deletar_nota(db: Session, id_nota: int) -> bool:
-    """Deletar nota."""
-    db_nota = obter_nota(db, id_nota)
-    if db_nota:
-        db.delete(db_nota)
-        db.commit()
-        return True
-    return False
+def atualizar_nota_parcial(
+    db: Session, id_nota: int, nota: schemas.NotaUpdate, ra: Optional[str] = None
+) -> Optional[models.Nota]:
+    """Atualizar nota (apenas campos fornecidos e não nulos) em um UPDATE."""
+    valores = {c: v for c, v in _campos_enviados(nota).items() if v is not None}
+    try:
+        return _atualizar_por_id(
+            db, models.Nota, models.Nota.id_nota, id_nota, valores, ra=ra
+        )
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+def deletar_nota(db: Session, id_nota: int, ra: Optional[str] = None) -> bool:
+    """Deletar nota (com `ra`, só se pertencer a esse RA)."""
+    return _deletar_por_id(db, models.Nota.id_nota, id_nota, ra)
 
 
 # ============================================================================
 # ANOTAÇÃO
 # ============================================================================
 
+_COLUNAS_ANOTACAO = _colunas_leitura(models.Anotacao)
+
 
 def criar_anotacao(db: Session, anotacao: schemas.AnotacaoCreate) -> models.Anotacao:
     """Criar nova anotação."""
@@ -769,46 +1463,113 @@ def criar_anotacao(db: Session, anotacao: schemas.AnotacaoCreate) -> models.Anot
         db_anotacao = models.Anotacao(**anotacao.model_dump())
         db.add(db_anotacao)
         db.commit()
-        db.refresh(db_anotacao)
         return db_anotacao
     except IntegrityError:
         db.rollback()
         raise
 
 
+def criar_anotacoes_em_lote(
+    db: Session, ra: str, anotacoes: List[schemas.AnotacaoCreate]
+) -> List[int]:
+    """Criar vários anotações do usuário (RA) de uma vez."""
+    return _inserir_em_lote(db, models.Anotacao.id_anotacao, ra, anotacoes)
+
+
 def obter_anotacao(db: Session, id_anotacao: int) -> Optional[models.Anotacao]:
-    """Obter anotação por ID."""
+    """
+    Obter anotação por ID.
+
+    Leituras repetidas do mesmo ID saem do snapshot em `cache.anotacoes_cache`;
+    `atualizar_anotacao` e `deletar_anotacao` o invalidam.
+    """
+    return _obter_com_snapshot(db, models.Anotacao, cache.anotacoes_cache, id_anotacao)
+
+
+def obter_ra_anotacao(db: Session, id_anotacao: int) -> Optional[str]:
+    """Obter apenas o RA dono da anotação (None se ela não existir)."""
     return (
-        db.query(models.Anotacao)
+        db.query(models.Anotacao.ra)
         .filter(models.Anotacao.id_anotacao == id_anotacao)
-        .first()
+        .scalar()
     )
 
 
 def obter_anotacoes_por_usuario(
-    db: Session, ra: str, skip: int = 0, limit: int = 100
-) -> List[models.Anotacao]:
-    """Listar anotações do usuário."""
-    return (
-        db.query(models.Anotacao)
-        .filter(models.Anotacao.ra == ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Row]:
+    """Listar anotações do usuário (linhas somente leitura)."""
+    query = db.query(*_COLUNAS_ANOTACAO).filter(models.Anotacao.ra == ra)
+    return _paginar(query, models.Anotacao.id_anotacao, skip, limit, after_id)
+
+
+def obter_anotacoes_por_usuario_com_versao(
+    db: Session,
+    ra: str,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Row], int, str]:
+    """Listar anotações do usuário junto com `(total, versão)`, em uma query."""
+    return _paginar_com_versao(
+        db, models.Anotacao, _COLUNAS_ANOTACAO, ra, skip, limit, after_id
     )
 
 
 def atualizar_anotacao(
-    db: Session, id_anotacao: int, anotacao: schemas.AnotacaoCreate
+    db: Session,
+    id_anotacao: int,
+    anotacao: schemas.AnotacaoCreate,
+    ra: Optional[str] = None,
 ) -> Optional[models.Anotacao]:
-    """Atualizar anotação."""
+    """
+    Atualizar anotação.
+
+    Com `ra`, é um único UPDATE ... WHERE id_anotacao AND ra; None se a
+    anotação não existe ou pertence a outro RA.
+    """
     try:
-        db_anotacao = obter_anotacao(db, id_anotacao)
-        if db_anotacao:
-            for key, value in anotacao.model_dump().items():
-                setattr(db_anotacao, key, value)
-            db.commit()
-            db.refresh(db_anotacao)
+        db_anotacao = _atualizar_por_id(
+            db,
+            models.Anotacao,
+            models.Anotacao.id_anotacao,
+            id_anotacao,
+            anotacao.model_dump(),
+            ra=ra,
+        )
+        cache.invalidar_anotacao(id_anotacao)
+        return db_anotacao
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+def atualizar_anotacao_parcial(
+    db: Session,
+    id_anotacao: int,
+    anotacao: schemas.AnotacaoUpdate,
+    ra: Optional[str] = None,
+) -> Optional[models.Anotacao]:
+    """
+    Atualizar anotação do usuário (RA) apenas nos campos fornecidos.
+
+    Com `ra`, é um único UPDATE ... WHERE id_anotacao AND ra; None se a
+    anotação não existe ou pertence a outro RA.
+    """
+    try:
+        db_anotacao = _atualizar_por_id(
+            db,
+            models.Anotacao,
+            models.Anotacao.id_anotacao,
+            id_anotacao,
+            _campos_enviados(anotacao),
+            ra=ra,
+        )
+        cache.invalidar_anotacao(id_anotacao)
         return db_anotacao
     except IntegrityError:
         db.rollback()
@@ -817,9 +1578,6 @@ def atualizar_anotacao(
 
 def deletar_anotacao(db: Session, id_anotacao: int) -> bool:
     """Deletar anotação."""
-    db_anotacao = obter_anotacao(db, id_anotacao)
-    if db_anotacao:
-        db.delete(db_anotacao)
-        db.commit()
-        return True
-    return False
+    removido = _deletar_por_id(db, models.Anotacao.id_anotacao, id_anotacao)
+    cache.invalidar_anotacao(id_anotacao)
+    return removido
@@ -6,6 +6,50 @@ e legibilidade do código.
 """
 
 from enum import IntEnum
+from types import MappingProxyType
+
+# ============================================================================
+# DESCRIÇÕES (montadas uma única vez, na importação do módulo)
+# ============================================================================
+
+_DESCRICAO_TIPO_DATA = MappingProxyType(
+    {
+        1: "Falta",
+        2: "Não Letivo",
+        3: "Letivo",
+    }
+)
+
+_DESCRICAO_DIA_SEMANA = MappingProxyType(
+    {
+        1: "Segunda-feira",
+        2: "Terça-feira",
+        3: "Quarta-feira",
+        4: "Quinta-feira",
+        5: "Sexta-feira",
+        6: "Sábado",
+    }
+)
+
+_DESCRICAO_NUMERO_AULA = MappingProxyType(
+    {
+        1: "Primeira Aula",
+        2: "Segunda Aula",
+        3: "Terceira Aula",
+        4: "Quarta Aula",
+    }
+)
+
+_DESCRICAO_BIMESTRE = MappingProxyType(
+    {
+        1: "Primeiro Bimestre",
+        2: "Segundo Bimestre",
+        3: "Terceiro Bimestre",
+        4: "Quarto Bimestre",
+    }
+)
+
+_DESCRICAO_MODULO = MappingProxyType({n: f"Módulo {n}" for n in range(1, 13)})
 
 
 class TipoDataEnum(IntEnum):
@@ -22,12 +66,7 @@ class TipoDataEnum(IntEnum):
     @classmethod
     def descricao(cls, valor: int) -> str:
         """Retorna descrição legível do tipo de data."""
-        mapa = {
-            1: "Falta",
-            2: "Não Letivo",
-            3: "Letivo",
-        }
-        return mapa.get(valor, "Desconhecido")
+        return _DESCRICAO_TIPO_DATA.get(valor, "Desconhecido")
 
 
 class DiaSemanaEnum(IntEnum):
@@ -47,15 +86,7 @@ class DiaSemanaEnum(IntEnum):
     @classmethod
     def descricao(cls, valor: int) -> str:
         """Retorna nome legível do dia da semana."""
-        mapa = {
-            1: "Segunda-feira",
-            2: "Terça-feira",
-            3: "Quarta-feira",
-            4: "Quinta-feira",
-            5: "Sexta-feira",
-            6: "Sábado",
-        }
-        return mapa.get(valor, "Desconhecido")
+        return _DESCRICAO_DIA_SEMANA.get(valor, "Desconhecido")
 
 
 class NumeroAulaEnum(IntEnum):
@@ -73,13 +104,7 @@ class NumeroAulaEnum(IntEnum):
     @classmethod
     def descricao(cls, valor: int) -> str:
         """Retorna nome legível do número da aula."""
-        mapa = {
-            1: "Primeira Aula",
-            2: "Segunda Aula",
-            3: "Terceira Aula",
-            4: "Quarta Aula",
-        }
-        return mapa.get(valor, "Desconhecido")
+        return _DESCRICAO_NUMERO_AULA.get(valor, "Desconhecido")
 
 
 class TipoBimestreEnum(IntEnum):
@@ -95,13 +120,7 @@ class TipoBimestreEnum(IntEnum):
     @classmethod
     def descricao(cls, valor: int) -> str:
         """Retorna nome legível do bimestre."""
-        mapa = {
-            1: "Primeiro Bimestre",
-            2: "Segundo Bimestre",
-            3: "Terceiro Bimestre",
-            4: "Quarto Bimestre",
-        }
-        return mapa.get(valor, "Desconhecido")
+        return _DESCRICAO_BIMESTRE.get(valor, "Desconhecido")
 
 
 class TipoModuloEnum(IntEnum):
@@ -125,4 +144,4 @@ class TipoModuloEnum(IntEnum):
     @classmethod
     def descricao(cls, valor: int) -> str:
         """Retorna nome legível do módulo."""
-        return f"Módulo {valor}" if 1 <= valor <= 12 else "Desconhecido"
+        return _DESCRICAO_MODULO.get(valor, "Desconhecido")
@@ -1,6 +1,13 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import (
+    DBAPIError,
+    IntegrityError,
+    OperationalError,
+    SQLAlchemyError,
+)
 
 from . import models  # noqa: F401 - Necessário para registrar os modelos no SQLAlchemy
 from . import constants
@@ -29,9 +36,12 @@ app = FastAPI(
     title="API Agenda Acadêmica",
     version=constants.API_VERSION,
     description="API para gerenciamento de agenda acadêmica de alunos",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS - Configurado com domínios específicos em produção
+# (frozensets: o Starlette testa origem/método com `in` a cada requisição e
+# monta os headers Access-Control-* uma única vez, no registro do middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=constants.CORS_ORIGINS,
@@ -41,6 +51,35 @@ app.add_middleware(
 )
 
 
+# ============================================================================
+# TRATAMENTO DE ERROS
+# ============================================================================
+
+
+@app.exception_handler(SQLAlchemyError)
+def erro_banco_de_dados(request: Request, exc: SQLAlchemyError):
+    """
+    Converte erros do banco não tratados nos endpoints, sem expor detalhes internos.
+
+    Violação de restrição (IntegrityError) é erro do cliente (400); falha
+    operacional ou conexão perdida (OperationalError, DBAPIError com
+    `connection_invalidated`) indica indisponibilidade do banco (503). Os
+    demais são bugs e seguem como 500.
+    """
+    if isinstance(exc, IntegrityError):
+        return ORJSONResponse(
+            status_code=400,
+            content={"detail": "Os dados enviados violam uma restrição do banco"},
+        )
+    if isinstance(exc, OperationalError) or (
+        isinstance(exc, DBAPIError) and exc.connection_invalidated
+    ):
+        return ORJSONResponse(
+            status_code=503, content={"detail": "Banco de dados indisponível"}
+        )
+    raise exc
+
+
 # ============================================================================
 # TEMPLATES
 # ============================================================================
@@ -51,14 +90,20 @@ templates = Jinja2Templates(directory="templates")
 # ROUTERS
 # ============================================================================
 
-app.include_router(health.router, prefix="/api/v1/health")
-app.include_router(usuario.router, prefix="/api/v1/usuario")
-app.include_router(notas.router, prefix="/api/v1/notas")
-app.include_router(discentes.router, prefix="/api/v1/discentes")
-app.include_router(anotacao.router, prefix="/api/v1/anotacao")
-app.include_router(docentes.router, prefix="/api/v1/docentes")
-app.include_router(horario.router, prefix="/api/v1/horario")
-app.include_router(calendario.router, prefix="/api/v1/calendario")
+# (router, prefixo) - registrados uma única vez, na ordem abaixo
+ROUTERS = (
+    (health.router, "/api/v1/health"),
+    (usuario.router, "/api/v1/usuario"),
+    (notas.router, "/api/v1/notas"),
+    (discentes.router, "/api/v1/discentes"),
+    (anotacao.router, "/api/v1/anotacao"),
+    (docentes.router, "/api/v1/docentes"),
+    (horario.router, "/api/v1/horario"),
+    (calendario.router, "/api/v1/calendario"),
+)
+
+for router, prefixo in ROUTERS:
+    app.include_router(router, prefix=prefixo)
 
 # ============================================================================
 # ROTAS PRINCIPAIS
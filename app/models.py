@@ -1,6 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Date,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from .database import Base
 
 
@@ -9,17 +17,38 @@ from .database import Base
 # ============================================================================
 
 
+def _coluna_versao() -> Column:
+    """
+    Contador de versão da linha, incrementado pelo banco a cada UPDATE.
+
+    Usado para gerar o ETag das listagens por usuário (ver
+    `crud.obter_versao_por_usuario`) sem depender da resolução do relógio.
+    """
+    return Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("versao + 1"),
+    )
+
+
 class Instituicao(Base):
     """Modelo de Instituição de Ensino"""
 
     __tablename__ = "instituicao"
+    __table_args__ = (UniqueConstraint("nome", name="uq_instituicao_nome"),)
 
     id_instituicao = Column(Integer, primary_key=True, index=True)
     nome = Column(String(80), nullable=False)
 
     # Relacionamento
-    usuarios = relationship("Usuario", back_populates="instituicao")
-    cursos = relationship("Curso", back_populates="instituicao")
+    usuarios = relationship(
+        "Usuario", back_populates="instituicao", lazy="raise", passive_deletes=True
+    )
+    cursos = relationship(
+        "Curso", back_populates="instituicao", lazy="raise", passive_deletes=True
+    )
 
 
 class Usuario(Base):
@@ -48,12 +77,23 @@ class Usuario(Base):
     bimestre = Column(Integer, nullable=True)
 
     # Relacionamentos
+    # Coleções (e o `usuario` das tabelas filhas) usam lazy="raise": quem precisar
+    # delas carrega com selectinload (evita N+1 silencioso); passive_deletes
+    # deixa as FKs por conta do banco.
     instituicao = relationship("Instituicao", back_populates="usuarios")
     curso = relationship("Curso", back_populates="usuarios")
-    calendarios = relationship("Calendario", back_populates="usuario")
-    horarios = relationship("Horario", back_populates="usuario")
-    notas = relationship("Nota", back_populates="usuario")
-    anotacoes = relationship("Anotacao", back_populates="usuario")
+    calendarios = relationship(
+        "Calendario", back_populates="usuario", lazy="raise", passive_deletes=True
+    )
+    horarios = relationship(
+        "Horario", back_populates="usuario", lazy="raise", passive_deletes=True
+    )
+    notas = relationship(
+        "Nota", back_populates="usuario", lazy="raise", passive_deletes=True
+    )
+    anotacoes = relationship(
+        "Anotacao", back_populates="usuario", lazy="raise", passive_deletes=True
+    )
 
 
 class TipoData(Base):
@@ -66,21 +106,35 @@ class TipoData(Base):
     nome = Column(String(20), nullable=False)
 
     # Relacionamento
-    calendarios = relationship("Calendario", back_populates="tipo_data")
+    calendarios = relationship(
+        "Calendario", back_populates="tipo_data", lazy="raise", passive_deletes=True
+    )
 
 
 class Calendario(Base):
     """Modelo de Calendário Acadêmico"""
 
     __tablename__ = "calendario"
+    __table_args__ = (
+        UniqueConstraint("ra", "data_evento", name="uq_calendario_ra_data"),
+        Index(
+            "ix_calendario_ra_tipo_id",
+            "ra",
+            "id_tipo_data",
+            "id_data_evento",
+            postgresql_include=["data_evento"],
+        ),
+        Index("ix_calendario_ra_id", "ra", "id_data_evento"),
+    )
 
     id_data_evento = Column(Integer, primary_key=True, index=True)
     ra = Column(String(13), ForeignKey("usuario.ra"), nullable=False, index=True)
     data_evento = Column(Date, nullable=False)
     id_tipo_data = Column(Integer, ForeignKey("tipo_data.id_tipo_data"), nullable=False)
+    versao = _coluna_versao()
 
     # Relacionamentos
-    usuario = relationship("Usuario", back_populates="calendarios")
+    usuario = relationship("Usuario", back_populates="calendarios", lazy="raise")
     tipo_data = relationship("TipoData", back_populates="calendarios")
 
 
@@ -88,6 +142,9 @@ class Curso(Base):
     """Modelo de Curso"""
 
     __tablename__ = "curso"
+    __table_args__ = (
+        UniqueConstraint("nome", "id_instituicao", name="uq_curso_nome_instituicao"),
+    )
 
     id_curso = Column(Integer, primary_key=True, index=True)
     nome = Column(String(80), nullable=False)
@@ -97,28 +154,33 @@ class Curso(Base):
 
     # Relacionamentos
     instituicao = relationship("Instituicao", back_populates="cursos")
-    usuarios = relationship("Usuario", back_populates="curso")
+    usuarios = relationship(
+        "Usuario", back_populates="curso", lazy="raise", passive_deletes=True
+    )
 
 
 class Horario(Base):
     """Modelo de Horário de Aulas"""
 
     __tablename__ = "horario"
+    __table_args__ = (Index("ix_horario_ra_dia", "ra", "dia_semana"),)
 
     id_horario = Column(Integer, primary_key=True, index=True)
     ra = Column(String(13), ForeignKey("usuario.ra"), nullable=False, index=True)
     dia_semana = Column(Integer, nullable=False)
     numero_aula = Column(Integer, nullable=True)
     disciplina = Column(String(100), nullable=True)
+    versao = _coluna_versao()
 
     # Relacionamentos
-    usuario = relationship("Usuario", back_populates="horarios")
+    usuario = relationship("Usuario", back_populates="horarios", lazy="raise")
 
 
 class Docente(Base):
     """Modelo de Docente (Professor)"""
 
     __tablename__ = "docente"
+    __table_args__ = (Index("ix_docente_ra_id", "ra", "id_docente"),)
 
     id_docente = Column(Integer, primary_key=True, index=True)
     nome = Column(String(50), nullable=False)
@@ -127,14 +189,17 @@ class Docente(Base):
     disciplina = Column(String(100), nullable=True)
 
     # Relacionamentos
-    usuario = relationship("Usuario", foreign_keys=[ra])
+    usuario = relationship("Usuario", foreign_keys=[ra], lazy="raise")
 
 
 class Discente(Base):
     """Modelo de Discente (Aluno - sem login)"""
 
     __tablename__ = "discente"
-    __table_args__ = (UniqueConstraint("email", name="uq_discente_email"),)
+    __table_args__ = (
+        UniqueConstraint("email", name="uq_discente_email"),
+        Index("ix_discente_ra_id", "ra", "id_discente"),
+    )
 
     id_discente = Column(Integer, primary_key=True, index=True)
     nome = Column(String(50), nullable=False)
@@ -144,35 +209,42 @@ class Discente(Base):
     ra = Column(String(13), ForeignKey("usuario.ra"), nullable=False, index=True)
 
     # Relacionamentos
-    curso = relationship("Curso")
-    usuario = relationship("Usuario", foreign_keys=[ra])
+    curso = relationship("Curso", lazy="raise")
+    usuario = relationship("Usuario", foreign_keys=[ra], lazy="raise")
 
 
 class Nota(Base):
     """Modelo de Nota de Avaliação"""
 
     __tablename__ = "nota"
+    __table_args__ = (
+        Index("ix_nota_ra_disciplina", "ra", "disciplina"),
+        Index("ix_nota_ra_bimestre", "ra", "bimestre"),
+    )
 
     id_nota = Column(Integer, primary_key=True, index=True)
     ra = Column(String(13), ForeignKey("usuario.ra"), nullable=False, index=True)
     bimestre = Column(Integer, nullable=True)
     nota = Column(String(255), nullable=False)
     disciplina = Column(String(100), nullable=True)
+    versao = _coluna_versao()
 
     # Relacionamentos
-    usuario = relationship("Usuario", back_populates="notas")
+    usuario = relationship("Usuario", back_populates="notas", lazy="raise")
 
 
 class Anotacao(Base):
     """Modelo de Anotação/Memo do Usuário"""
 
     __tablename__ = "anotacao"
+    __table_args__ = (Index("ix_anotacao_ra_id", "ra", "id_anotacao"),)
 
     id_anotacao = Column(Integer, primary_key=True, index=True)
     ra = Column(String(13), ForeignKey("usuario.ra"), nullable=False, index=True)
     titulo = Column(String(50), nullable=False)
     anotacao = Column(String(255), nullable=False)
     dt_anotacao = Column(Date, nullable=False, default=func.current_date())
+    versao = _coluna_versao()
 
     # Relacionamento
-    usuario = relationship("Usuario", back_populates="anotacoes")
+    usuario = relationship("Usuario", back_populates="anotacoes", lazy="raise")
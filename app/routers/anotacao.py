@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional
 
 from ..database import get_db
-from .. import crud, models, schemas
-from ..auth import verificar_token
+from .. import constants, crud, models, schemas
+from ..auth import obter_ra_autenticado
+from ..utils import (
+    gerar_etag,
+    responder_se_nao_modificado,
+    resposta_item,
+    resposta_lista,
+)
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -28,13 +33,6 @@ class AnotacaoNaoEncontrada(HTTPException):
         super().__init__(status_code=404, detail="Anotação não encontrada")
 
 
-class ErroAoCriarAnotacao(HTTPException):
-    """Erro ao criar anotação"""
-
-    def __init__(self, detail: str):
-        super().__init__(status_code=400, detail=detail)
-
-
 class ErroAoAtualizarAnotacao(HTTPException):
     """Erro ao atualizar anotação"""
 
@@ -58,19 +56,6 @@ class PermissaoNegada(HTTPException):
         )
 
 
-# ============================================================================
-# SCHEMAS PARA ATUALIZAÇÃO PARCIAL
-# ============================================================================
-
-
-class AnotacaoUpdate(BaseModel):
-    titulo: Optional[str] = Field(None, min_length=1, max_length=50)
-    anotacao: Optional[str] = Field(None, min_length=1, max_length=255)
-
-    class Config:
-        from_attributes = True
-
-
 # ============================================================================
 # VALIDADORES (Responsabilidade Única)
 # ============================================================================
@@ -91,18 +76,25 @@ def _validar_anotacao_pertence_usuario(
     anotacao = _validar_anotacao_existe(db, id_anotacao)
 
     # Verificar se a anotação pertence ao usuário autenticado (comparar por RA)
-    try:
-        ra_anotacao = str(anotacao.ra) if hasattr(anotacao, "ra") else None
-        if ra_anotacao and ra_anotacao != ra_usuario:
-            raise PermissaoNegada()
-    except (ValueError, TypeError, AttributeError):
-        # Se não conseguir comparar, verifica se tem ra
-        if hasattr(anotacao, "ra") and anotacao.ra is not None:
-            raise PermissaoNegada()
+    if str(anotacao.ra) != str(ra_usuario):
+        raise PermissaoNegada()
 
     return anotacao
 
 
+def _validar_posse_anotacao(db: Session, id_anotacao: int, ra_usuario: str) -> None:
+    """
+    Valida existência e posse lendo só o RA da anotação (uma query, sem o registro).
+
+    Para PUT/DELETE, que não usam as colunas da anotação validada.
+    """
+    ra_anotacao = crud.obter_ra_anotacao(db, id_anotacao)
+    if ra_anotacao is None:
+        raise AnotacaoNaoEncontrada()
+    if ra_anotacao != ra_usuario:
+        raise PermissaoNegada()
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -113,7 +105,7 @@ def _validar_anotacao_pertence_usuario(
 )
 def criar_anotacao(
     anotacao: schemas.AnotacaoCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -134,34 +126,64 @@ def criar_anotacao(
     - 400: Erro de validação
     - 401: Token ausente ou inválido
     """
-    try:
-        # Obter RA do usuário autenticado
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
+    # Criar anotação com RA do usuário
+    db_anotacao = models.Anotacao(
+        ra=ra_usuario, titulo=anotacao.titulo, anotacao=anotacao.anotacao
+    )
+    db.add(db_anotacao)
+    db.commit()
 
-        # Criar anotação com RA do usuário
-        db_anotacao = models.Anotacao(
-            ra=ra_usuario, titulo=anotacao.titulo, anotacao=anotacao.anotacao
-        )
-        db.add(db_anotacao)
-        db.commit()
-        db.refresh(db_anotacao)
+    return schemas.GenericResponse(
+        data=db_anotacao, success=True, message="Anotação criada com sucesso"
+    )
 
-        return schemas.GenericResponse(
-            data=db_anotacao, success=True, message="Anotação criada com sucesso"
-        )
-    except Exception as e:
-        raise ErroAoCriarAnotacao(str(e))
+
+@router.post(
+    "/lote", response_model=schemas.GenericResponse[List[int]], status_code=201
+)
+def criar_anotacoes_em_lote(
+    anotacoes: List[schemas.AnotacaoCreate] = Body(
+        ..., min_length=1, max_length=constants.LOTE_MAX_ITENS
+    ),
+    ra_usuario: str = Depends(obter_ra_autenticado),
+    db: Session = Depends(get_db),
+):
+    """
+    Criar várias anotações de uma vez.
+
+    **Autenticação:**
+    - Requer token JWT no header `Authorization: Bearer <token>`
+
+    **Body:**
+    - Lista de anotações (1-1000 itens), cada uma com `titulo` e `anotacao`
+
+    **Restrições:**
+    - Todas as anotações serão associadas ao RA do usuário autenticado
+    - Inseridas em um único INSERT e um único commit (tudo ou nada)
+
+    **Respostas:**
+    - 201: IDs das anotações criadas, na ordem enviada
+    - 400: Erro ao criar anotações
+    - 401: Token ausente ou inválido
+    - 422: Lista vazia ou com mais de 1000 itens
+    """
+    ids = crud.criar_anotacoes_em_lote(db, ra_usuario, anotacoes)
+
+    return schemas.GenericResponse(
+        data=ids, success=True, message=f"{len(ids)} anotações criadas com sucesso"
+    )
 
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Anotacao])
 def listar_anotacoes(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    request: Request,
+    response: Response,
+    ra_usuario: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -173,6 +195,12 @@ def listar_anotacoes(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
+
+    **Cache HTTP:**
+    - A resposta traz `ETag`; reenvie-o em `If-None-Match` para receber 304
+      sem corpo enquanto os registros não mudarem
 
     **Restrições:**
     - Usuário só pode listar suas próprias anotações
@@ -181,26 +209,38 @@ def listar_anotacoes(
     - 200: Lista de anotações retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    # Obter RA do usuário autenticado
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
+
+    if "if-none-match" in request.headers:
+        # Revalidação: o agregado basta para decidir o 304 sem buscar a página
+        total, versao = crud.obter_versao_por_usuario(db, models.Anotacao, ra_usuario)
+        anotacoes = None
+    else:
+        # Página, total e versão em uma única query (funções de janela)
+        anotacoes, total, versao = crud.obter_anotacoes_por_usuario_com_versao(
+            db, ra_usuario, skip, limit, after_id
+        )
+
+    etag = gerar_etag(ra_usuario, "anotacao", versao, skip, limit, after_id)
+    nao_modificado = responder_se_nao_modificado(request, response, etag)
+    if nao_modificado:
+        return nao_modificado
 
     # Listar apenas anotações do usuário autenticado
-    anotacoes = crud.obter_anotacoes_por_usuario(db, ra_usuario, skip, limit)
-    total = db.query(models.Anotacao).filter(models.Anotacao.ra == ra_usuario).count()
+    if anotacoes is None:
+        anotacoes = crud.obter_anotacoes_por_usuario(
+            db, ra_usuario, skip, limit, after_id
+        )
 
-    return schemas.GenericListResponse(
-        data=anotacoes, total=total, skip=skip, limit=limit, success=True
+    # Linhas já têm a forma de schemas.Anotacao: serializa sem Pydantic por item
+    return resposta_lista(
+        response, anotacoes, schemas.Anotacao, "id_anotacao", total, skip, limit
     )
 
 
 @router.get("/{id_anotacao}", response_model=schemas.GenericResponse[schemas.Anotacao])
 def obter_anotacao(
     id_anotacao: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -221,21 +261,16 @@ def obter_anotacao(
     - 404: Anotação não encontrada
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     anotacao = _validar_anotacao_pertence_usuario(db, id_anotacao, ra_usuario)
 
-    return schemas.GenericResponse(data=anotacao, success=True)
+    return resposta_item(anotacao, schemas.Anotacao)
 
 
 @router.put("/{id_anotacao}", response_model=schemas.GenericResponse[schemas.Anotacao])
 def atualizar_anotacao(
     id_anotacao: int,
     anotacao: schemas.AnotacaoCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -262,22 +297,16 @@ def atualizar_anotacao(
     - 404: Anotação não encontrada
     - 401: Token ausente ou inválido
     """
-    try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-        _validar_anotacao_pertence_usuario(db, id_anotacao, ra_usuario)
+    # UPDATE ... WHERE id_anotacao AND ra: posse verificada no próprio comando
+    db_atualizado = crud.atualizar_anotacao(db, id_anotacao, anotacao, ra=ra_usuario)
+    if db_atualizado is None:
+        # Nada atualizado: distingue anotação inexistente (404) de alheia (403)
+        _validar_posse_anotacao(db, id_anotacao, ra_usuario)
+        raise AnotacaoNaoEncontrada()
 
-        db_atualizado = crud.atualizar_anotacao(db, id_anotacao, anotacao)
-        return schemas.GenericResponse(
-            data=db_atualizado, success=True, message="Anotação atualizada com sucesso"
-        )
-    except (AnotacaoNaoEncontrada, PermissaoNegada):
-        raise
-    except Exception as e:
-        raise ErroAoAtualizarAnotacao(str(e))
+    return schemas.GenericResponse(
+        data=db_atualizado, success=True, message="Anotação atualizada com sucesso"
+    )
 
 
 @router.patch(
@@ -285,8 +314,8 @@ def atualizar_anotacao(
 )
 def atualizar_parcial_anotacao(
     id_anotacao: int,
-    anotacao_update: AnotacaoUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    anotacao_update: schemas.AnotacaoUpdate,
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -313,46 +342,30 @@ def atualizar_parcial_anotacao(
     - 404: Anotação não encontrada
     - 401: Token ausente ou inválido
     """
-    try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-        anotacao_existente = _validar_anotacao_pertence_usuario(
-            db, id_anotacao, ra_usuario
-        )
-
-        # Verificar se há dados para atualizar
-        update_data = anotacao_update.model_dump(exclude_unset=True)
-        if not update_data:
-            raise ErroAoAtualizarAnotacao("Nenhum dado fornecido para atualização")
+    # Verificar se há dados para atualizar
+    if not anotacao_update.model_fields_set:
+        raise ErroAoAtualizarAnotacao("Nenhum dado fornecido para atualização")
 
-        # Preparar dados completos para atualização
-        dados_atuais = {
-            "titulo": str(anotacao_existente.titulo),
-            "anotacao": str(anotacao_existente.anotacao),
-        }
-        dados_atuais.update(update_data)
-
-        anotacao_completa = schemas.AnotacaoCreate(**dados_atuais)
-        db_atualizado = crud.atualizar_anotacao(db, id_anotacao, anotacao_completa)
+    # UPDATE ... WHERE id_anotacao AND ra: sem leitura prévia da anotação
+    db_atualizado = crud.atualizar_anotacao_parcial(
+        db, id_anotacao, anotacao_update, ra=ra_usuario
+    )
+    if db_atualizado is None:
+        # Nada atualizado: distingue anotação inexistente (404) de alheia (403)
+        _validar_posse_anotacao(db, id_anotacao, ra_usuario)
+        raise AnotacaoNaoEncontrada()
 
-        return schemas.GenericResponse(
-            data=db_atualizado,
-            success=True,
-            message="Anotação atualizada parcialmente com sucesso",
-        )
-    except (AnotacaoNaoEncontrada, ErroAoAtualizarAnotacao, PermissaoNegada):
-        raise
-    except Exception as e:
-        raise ErroAoAtualizarAnotacao(str(e))
+    return schemas.GenericResponse(
+        data=db_atualizado,
+        success=True,
+        message="Anotação atualizada parcialmente com sucesso",
+    )
 
 
 @router.delete("/{id_anotacao}", response_model=schemas.GenericResponse[dict])
 def deletar_anotacao(
     id_anotacao: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -374,12 +387,7 @@ def deletar_anotacao(
     - 404: Anotação não encontrada
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
-    _validar_anotacao_pertence_usuario(db, id_anotacao, ra_usuario)
+    _validar_posse_anotacao(db, id_anotacao, ra_usuario)
 
     if crud.deletar_anotacao(db, id_anotacao):
         return schemas.GenericResponse(
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date
+from typing import Optional
 
 from ..database import get_db
 from .. import crud, models, schemas
-from ..auth import verificar_token
+from ..auth import obter_ra_autenticado
+from ..utils import (
+    gerar_etag,
+    responder_se_nao_modificado,
+    resposta_item,
+    resposta_lista,
+)
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -19,7 +27,8 @@ router = APIRouter(
 # CONSTANTES E MAPEAMENTOS
 # ============================================================================
 
-TIPO_DATA_NOMES = {1: "Falta", 2: "Não Letivo", 3: "Letivo"}
+# Indexado pelo id_tipo_data (1..3, garantido pelo Path); a posição 0 não é usada
+TIPO_DATA_NOMES = ("", "Falta", "Não Letivo", "Letivo")
 
 # ============================================================================
 # EXCEÇÕES CUSTOMIZADAS (Early Return Pattern)
@@ -81,26 +90,9 @@ def _validar_tipo_data_existe(db: Session, id_tipo_data: int) -> None:
         raise TipoDataInvalido(id_tipo_data)
 
 
-def _validar_evento_nao_duplicado(
-    db: Session, ra: str, data_evento, excluir_id: int | None = None
-) -> None:
-    """Valida se evento já existe para esta combinação RA+data."""
-    query = db.query(models.Calendario).filter(
-        models.Calendario.ra == ra, models.Calendario.data_evento == data_evento
-    )
-
-    if excluir_id:
-        query = query.filter(models.Calendario.id_data_evento != excluir_id)
-
-    if query.first():
-        raise EventoDuplicado(ra, str(data_evento))
-
-
-def _validar_evento_pertence_usuario(
-    db: Session, id_evento: int, ra: str
-) -> models.Calendario:
+def _validar_evento_pertence_usuario(db: Session, id_evento: int, ra: str):
     """Valida se evento existe e pertence ao usuário. Retorna evento ou lança exceção."""
-    evento = crud.obter_calendario(db, id_evento)
+    evento = crud.obter_linha_calendario(db, id_evento)
 
     if not evento:
         raise CalendarioNotFound()
@@ -111,10 +103,37 @@ def _validar_evento_pertence_usuario(
     return evento
 
 
-def _parsear_data(data_str: str):
+def _validar_posse_evento(db: Session, id_evento: int, ra: str) -> None:
+    """
+    Valida existência e posse lendo só o RA do evento (uma query, sem o registro).
+
+    Usado depois de um UPDATE/DELETE filtrado por RA que não afetou nenhuma linha.
+    """
+    ra_evento = crud.obter_ra_calendario(db, id_evento)
+    if ra_evento is None:
+        raise CalendarioNotFound()
+    if ra_evento != ra:
+        raise PermissaoNegada()
+
+
+def _viola_unicidade_ra_data(erro: IntegrityError) -> bool:
+    """Indica se a IntegrityError veio da constraint uq_calendario_ra_data."""
+    diag = getattr(erro.orig, "diag", None)
+    nome_constraint = getattr(diag, "constraint_name", None)
+    if nome_constraint is not None:
+        return nome_constraint == "uq_calendario_ra_data"
+    # Drivers sem o nome da constraint (ex.: SQLite) citam só as colunas
+    return "calendario.ra, calendario.data_evento" in str(erro.orig)
+
+
+def _parsear_data(data_str: str) -> date:
     """Parse data em formato YYYY-MM-DD. Lança FormatoDataInvalido se falhar."""
+    # fromisoformat é bem mais rápido que strptime, mas também aceita outras
+    # formas ISO (20241225, 2024-W52-3); o formato exige os hífens nas posições
+    if len(data_str) != 10 or data_str[4] != "-" or data_str[7] != "-":
+        raise FormatoDataInvalido()
     try:
-        return datetime.strptime(data_str, "%Y-%m-%d").date()
+        return date.fromisoformat(data_str)
     except ValueError:
         raise FormatoDataInvalido()
 
@@ -129,7 +148,7 @@ def _parsear_data(data_str: str):
 )
 def criar_evento_calendario(
     calendario: schemas.CalendarioCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -152,21 +171,14 @@ def criar_evento_calendario(
     - 409: Evento já existe para esta data
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
 
     # Validações
     _validar_tipo_data_existe(db, calendario.id_tipo_data)
-    _validar_evento_nao_duplicado(db, ra, calendario.data_evento)
 
-    # Preparar dados
-    evento_data = calendario.model_dump()
-    evento_data["ra"] = ra
-
-    # Criar
-    db_evento = models.Calendario(**evento_data)
-    db.add(db_evento)
-    db.commit()
-    db.refresh(db_evento)
+    # Criar (a unicidade RA+data é garantida pelo próprio INSERT ... ON CONFLICT)
+    db_evento = crud.criar_calendario_se_nao_existir(db, ra, calendario)
+    if db_evento is None:
+        raise EventoDuplicado(ra, str(calendario.data_evento))
 
     return schemas.GenericResponse(
         data=db_evento, success=True, message="Evento do calendário criado com sucesso"
@@ -180,9 +192,14 @@ def criar_evento_calendario(
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Calendario])
 def listar_eventos_calendario(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    request: Request,
+    response: Response,
+    ra: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -194,24 +211,45 @@ def listar_eventos_calendario(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
+
+    **Cache HTTP:**
+    - A resposta traz `ETag`; reenvie-o em `If-None-Match` para receber 304
+      sem corpo enquanto os registros não mudarem
 
     **Respostas:**
     - 200: Lista de eventos retornada com sucesso
     - 404: Nenhum evento encontrado para o usuário
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
 
-    eventos = crud.obter_calendarios_por_usuario(db, ra, skip, limit)
-    total = db.query(models.Calendario).filter(models.Calendario.ra == ra).count()
+    if "if-none-match" in request.headers:
+        # Revalidação: o agregado basta para decidir o 304 sem buscar a página
+        total, versao = crud.obter_versao_por_usuario(db, models.Calendario, ra)
+        eventos = None
+    else:
+        # Página, total e versão em uma única query (funções de janela)
+        eventos, total, versao = crud.obter_calendarios_por_usuario_com_versao(
+            db, ra, skip, limit, after_id
+        )
 
     if total == 0:
         raise HTTPException(
             status_code=404, detail=f"Nenhum evento encontrado para o RA {ra}"
         )
 
-    return schemas.GenericListResponse(
-        data=eventos, success=True, total=total, skip=skip, limit=limit
+    etag = gerar_etag(ra, "calendario", versao, skip, limit, after_id)
+    nao_modificado = responder_se_nao_modificado(request, response, etag)
+    if nao_modificado:
+        return nao_modificado
+
+    if eventos is None:
+        eventos = crud.obter_calendarios_por_usuario(db, ra, skip, limit, after_id)
+
+    # Serializa as linhas direto com orjson (sem um modelo Pydantic por evento)
+    return resposta_lista(
+        response, eventos, schemas.Calendario, "id_data_evento", total, skip, limit
     )
 
 
@@ -220,7 +258,7 @@ def listar_eventos_calendario(
 )
 def obter_evento_calendario(
     id_data_evento: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -241,10 +279,9 @@ def obter_evento_calendario(
     - 404: Evento não encontrado
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
     evento = _validar_evento_pertence_usuario(db, id_data_evento, ra)
 
-    return schemas.GenericResponse(data=evento, success=True)
+    return resposta_item(evento, schemas.Calendario)
 
 
 @router.get(
@@ -252,7 +289,7 @@ def obter_evento_calendario(
 )
 def obter_evento_por_data(
     data_evento: str = Path(..., description="Data no formato YYYY-MM-DD"),
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -270,16 +307,9 @@ def obter_evento_por_data(
     - 404: Nenhum evento encontrado para esta data
     - 401: Token ausente ou inválido
     """
-    ra = usuario_autenticado.ra
     data_parsed = _parsear_data(data_evento)
 
-    evento = (
-        db.query(models.Calendario)
-        .filter(
-            models.Calendario.ra == ra, models.Calendario.data_evento == data_parsed
-        )
-        .first()
-    )
+    evento = crud.obter_linha_calendario_por_data(db, ra, data_parsed)
 
     if not evento:
         raise HTTPException(
@@ -287,7 +317,7 @@ def obter_evento_por_data(
             detail=f"Nenhum evento encontrado para o RA {ra} na data {data_evento}",
         )
 
-    return schemas.GenericResponse(data=evento, success=True)
+    return resposta_item(evento, schemas.Calendario)
 
 
 @router.get(
@@ -295,12 +325,16 @@ def obter_evento_por_data(
     response_model=schemas.GenericListResponse[schemas.Calendario],
 )
 def listar_eventos_por_tipo(
+    response: Response,
     id_tipo_data: int = Path(
         ..., ge=1, le=3, description="Tipo (1=Falta, 2=Não Letivo, 3=Letivo)"
     ),
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -315,6 +349,8 @@ def listar_eventos_por_tipo(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
 
     **Respostas:**
     - 200: Lista de eventos retornada com sucesso
@@ -322,30 +358,24 @@ def listar_eventos_por_tipo(
     - 404: Nenhum evento encontrado para este tipo
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
 
     # Validação
     _validar_tipo_data_existe(db, id_tipo_data)
 
-    # Buscar eventos
-    eventos = crud.obter_calendarios_por_tipo(db, ra, id_tipo_data, skip, limit)
-    total = (
-        db.query(models.Calendario)
-        .filter(
-            models.Calendario.ra == ra, models.Calendario.id_tipo_data == id_tipo_data
-        )
-        .count()
+    # Buscar eventos e total em uma única query (COUNT(*) OVER ())
+    eventos, total = crud.obter_calendarios_por_tipo_com_total(
+        db, ra, id_tipo_data, skip, limit, after_id
     )
 
     if total == 0:
-        tipo_nome = TIPO_DATA_NOMES.get(id_tipo_data, f"Tipo {id_tipo_data}")
+        tipo_nome = TIPO_DATA_NOMES[id_tipo_data]
         raise HTTPException(
             status_code=404,
             detail=f"Nenhum evento do tipo '{tipo_nome}' encontrado para o RA {ra}",
         )
 
-    return schemas.GenericListResponse(
-        data=eventos, success=True, total=total, skip=skip, limit=limit
+    return resposta_lista(
+        response, eventos, schemas.Calendario, "id_data_evento", total, skip, limit
     )
 
 
@@ -360,7 +390,7 @@ def listar_eventos_por_tipo(
 def atualizar_evento_calendario(
     id_data_evento: int,
     calendario: schemas.CalendarioCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -389,22 +419,22 @@ def atualizar_evento_calendario(
     - 409: Evento já existe para esta data
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
 
     # Validações
-    evento = _validar_evento_pertence_usuario(db, id_data_evento, ra)
     _validar_tipo_data_existe(db, calendario.id_tipo_data)
-    _validar_evento_nao_duplicado(db, ra, calendario.data_evento, id_data_evento)
-
-    # Atualizar
-    evento_data = calendario.model_dump()
-    evento_data["ra"] = ra
-
-    for key, value in evento_data.items():
-        setattr(evento, key, value)
 
-    db.commit()
-    db.refresh(evento)
+    # Atualizar (UPDATE ... WHERE ra = ... RETURNING; a posse vai no próprio WHERE
+    # e a unicidade RA+data na constraint uq_calendario_ra_data)
+    try:
+        evento = crud.atualizar_calendario(db, id_data_evento, calendario, ra=ra)
+    except IntegrityError as e:
+        if not _viola_unicidade_ra_data(e):
+            raise
+        raise EventoDuplicado(ra, str(calendario.data_evento))
+    if evento is None:
+        # Nada atualizado: distingue evento inexistente (404) de alheio (403)
+        _validar_posse_evento(db, id_data_evento, ra)
+        raise CalendarioNotFound()
 
     return schemas.GenericResponse(
         data=evento, success=True, message="Evento do calendário atualizado com sucesso"
@@ -417,7 +447,7 @@ def atualizar_evento_calendario(
 def atualizar_parcial_evento_calendario(
     id_data_evento: int,
     calendario: schemas.CalendarioUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -446,28 +476,24 @@ def atualizar_parcial_evento_calendario(
     - 409: Evento já existe para esta data
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
-
-    # Validação de propriedade
-    evento = _validar_evento_pertence_usuario(db, id_data_evento, ra)
 
     # Validar tipo se fornecido
     if calendario.id_tipo_data:
         _validar_tipo_data_existe(db, calendario.id_tipo_data)
 
-    # Validar duplicação se data foi alterada
-    if calendario.data_evento:
-        _validar_evento_nao_duplicado(db, ra, calendario.data_evento, id_data_evento)
-
-    # Atualizar apenas campos fornecidos
-    dados_atualizacao = calendario.model_dump(exclude_unset=True)
-    dados_atualizacao["ra"] = ra
-
-    for key, value in dados_atualizacao.items():
-        setattr(evento, key, value)
-
-    db.commit()
-    db.refresh(evento)
+    # Atualizar apenas campos fornecidos e não nulos (posse validada no WHERE
+    # do UPDATE; data repetida viola uq_calendario_ra_data)
+    try:
+        evento = crud.atualizar_calendario_parcial(
+            db, id_data_evento, calendario, ra=ra
+        )
+    except IntegrityError as e:
+        if not _viola_unicidade_ra_data(e):
+            raise
+        raise EventoDuplicado(ra, str(calendario.data_evento))
+    if evento is None:
+        _validar_posse_evento(db, id_data_evento, ra)
+        raise CalendarioNotFound()
 
     return schemas.GenericResponse(
         data=evento,
@@ -484,7 +510,7 @@ def atualizar_parcial_evento_calendario(
 @router.delete("/{id_data_evento}", response_model=schemas.GenericResponse[dict])
 def deletar_evento_calendario(
     id_data_evento: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -505,17 +531,15 @@ def deletar_evento_calendario(
     - 404: Evento não encontrado
     - 401: Token ausente ou inválido
     """
-    ra = str(usuario_autenticado.ra)
-
-    # Validação
-    _validar_evento_pertence_usuario(db, id_data_evento, ra)
 
-    # Deletar
-    if crud.deletar_calendario(db, id_data_evento):
+    # Deletar (DELETE ... WHERE ra = ... RETURNING; a posse vai no próprio WHERE)
+    if crud.deletar_calendario(db, id_data_evento, ra):
         return schemas.GenericResponse(
             data={"id_deletado": id_data_evento},
             success=True,
             message="Evento do calendário deletado com sucesso",
         )
 
-    raise HTTPException(status_code=400, detail="Erro ao deletar evento do calendário")
+    # Nada removido: distingue evento inexistente (404) de alheio (403)
+    _validar_posse_evento(db, id_data_evento, ra)
+    raise CalendarioNotFound()
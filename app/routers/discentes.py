@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from ..database import get_db
 from .. import crud, models, schemas
-from ..auth import verificar_token
+from ..auth import obter_ra_autenticado
+from ..utils import proximo_cursor
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -85,37 +87,33 @@ def _validar_discente_pertence_usuario(
     discente = _validar_discente_existe(db, id_discente)
 
     # Verificar se o discente pertence ao usuário autenticado (comparar por RA)
-    try:
-        ra_discente = str(discente.ra) if hasattr(discente, "ra") else None
-        if ra_discente and ra_discente != ra_usuario:
-            raise PermissaoNegada()
-    except (ValueError, TypeError, AttributeError):
-        # Se não conseguir comparar, verifica se tem ra
-        if hasattr(discente, "ra") and discente.ra is not None:
-            raise PermissaoNegada()
+    if str(discente.ra) != str(ra_usuario):
+        raise PermissaoNegada()
 
     return discente
 
 
+def _validar_atualizacao_discente(
+    db: Session, id_discente: int, ra_usuario: str, email: str
+) -> None:
+    """Valida existência, posse e email único do discente em uma única query."""
+    ra_discente, email_em_uso = crud.verificar_atualizacao_discente(
+        db, id_discente, email
+    )
+    if ra_discente is None:
+        raise DiscenteNaoEncontrado()
+    if ra_discente != ra_usuario:
+        raise PermissaoNegada()
+    if email_em_uso:
+        raise EmailDuplicado()
+
+
 def _validar_email_unico(
     db: Session, email: str, id_discente_atual: int | None = None
 ) -> None:
     """Valida se email já está em uso por outro discente. Lança exceção se duplicado."""
-    discente_existente = crud.obter_discente_por_email(db, email)
-
-    if discente_existente is None:
-        return
-
-    # Se o email pertence ao mesmo discente, não é duplicação
-    if id_discente_atual is not None:
-        try:
-            id_existente = int(str(discente_existente.id_discente))
-            if id_existente == id_discente_atual:
-                return
-        except (ValueError, TypeError):
-            pass
-
-    raise EmailDuplicado()
+    if crud.email_discente_em_uso(db, email, id_discente_atual):
+        raise EmailDuplicado()
 
 
 # ============================================================================
@@ -128,7 +126,7 @@ def _validar_email_unico(
 )
 def criar_discente(
     discente: schemas.DiscenteCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -155,13 +153,6 @@ def criar_discente(
     try:
         _validar_email_unico(db, discente.email)
 
-        # Obter RA do usuário autenticado
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-
         # Criar discente diretamente com RA no banco de dados
         db_discente = models.Discente(
             nome=discente.nome,
@@ -172,7 +163,6 @@ def criar_discente(
         )
         db.add(db_discente)
         db.commit()
-        db.refresh(db_discente)
 
         return schemas.GenericResponse(
             data=db_discente, success=True, message="Discente criado com sucesso"
@@ -185,9 +175,12 @@ def criar_discente(
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Discente])
 def listar_discentes(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -199,6 +192,8 @@ def listar_discentes(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
 
     **Restrições:**
     - Usuário só pode listar seus próprios discentes
@@ -207,32 +202,26 @@ def listar_discentes(
     - 200: Lista de discentes retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    # Obter RA do usuário autenticado
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
 
-    # Listar apenas discentes do usuário autenticado
-    discentes = (
-        db.query(models.Discente)
-        .filter(models.Discente.ra == ra_usuario)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Listar apenas discentes do usuário autenticado (página e total em uma query)
+    discentes, total = crud.obter_discentes_por_usuario_com_total(
+        db, ra_usuario, skip, limit, after_id
     )
-    total = db.query(models.Discente).filter(models.Discente.ra == ra_usuario).count()
 
     return schemas.GenericListResponse(
-        data=discentes, total=total, skip=skip, limit=limit, success=True
+        data=discentes,
+        total=total,
+        skip=skip,
+        limit=limit,
+        next_cursor=proximo_cursor(discentes, limit, "id_discente"),
+        success=True,
     )
 
 
 @router.get("/{id_discente}", response_model=schemas.GenericResponse[schemas.Discente])
 def obter_discente(
     id_discente: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -253,11 +242,6 @@ def obter_discente(
     - 404: Discente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     discente = _validar_discente_pertence_usuario(db, id_discente, ra_usuario)
     return schemas.GenericResponse(data=discente, success=True)
 
@@ -265,7 +249,7 @@ def obter_discente(
 @router.get("/email/{email}", response_model=schemas.GenericResponse[schemas.Discente])
 def obter_discente_por_email(
     email: str,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -286,24 +270,14 @@ def obter_discente_por_email(
     - 404: Discente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     discente = crud.obter_discente_por_email(db, email)
 
     if not discente:
         raise DiscenteNaoEncontrado()
 
     # Verificar se pertence ao usuário (comparar por RA)
-    try:
-        ra_discente = str(discente.ra) if hasattr(discente, "ra") else None
-        if ra_discente and ra_discente != ra_usuario:
-            raise PermissaoNegada()
-    except (ValueError, TypeError, AttributeError):
-        if hasattr(discente, "ra") and discente.ra is not None:
-            raise PermissaoNegada()
+    if str(discente.ra) != str(ra_usuario):
+        raise PermissaoNegada()
 
     return schemas.GenericResponse(data=discente, success=True)
 
@@ -312,7 +286,7 @@ def obter_discente_por_email(
 def atualizar_discente_completo(
     id_discente: int,
     discente: schemas.DiscenteCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -343,13 +317,7 @@ def atualizar_discente_completo(
     - 401: Token ausente ou inválido
     """
     try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-        _validar_discente_pertence_usuario(db, id_discente, ra_usuario)
-        _validar_email_unico(db, discente.email, id_discente)
+        _validar_atualizacao_discente(db, id_discente, ra_usuario, discente.email)
 
         db_atualizado = crud.atualizar_discente(db, id_discente, discente)
         return schemas.GenericResponse(
@@ -367,7 +335,7 @@ def atualizar_discente_completo(
 def atualizar_discente_parcial(
     id_discente: int,
     discente_update: schemas.DiscenteUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -398,11 +366,6 @@ def atualizar_discente_parcial(
     - 401: Token ausente ou inválido
     """
     try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
         discente_existente = _validar_discente_pertence_usuario(
             db, id_discente, ra_usuario
         )
@@ -447,7 +410,7 @@ def atualizar_discente_parcial(
 @router.delete("/{id_discente}", response_model=schemas.GenericResponse[dict])
 def deletar_discente(
     id_discente: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -469,11 +432,6 @@ def deletar_discente(
     - 404: Discente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     _validar_discente_pertence_usuario(db, id_discente, ra_usuario)
 
     if crud.deletar_discente(db, id_discente):
@@ -5,7 +5,8 @@ from pydantic import BaseModel, Field, EmailStr
 
 from ..database import get_db
 from .. import crud, models, schemas
-from ..auth import verificar_token
+from ..auth import obter_ra_autenticado
+from ..utils import proximo_cursor
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -101,37 +102,31 @@ def _validar_docente_pertence_usuario(
     docente = _validar_docente_existe(db, id_docente)
 
     # Verificar se o docente pertence ao usuário autenticado (comparar por RA)
-    try:
-        ra_docente = str(docente.ra) if hasattr(docente, "ra") else None
-        if ra_docente and ra_docente != ra_usuario:
-            raise PermissaoNegada()
-    except (ValueError, TypeError, AttributeError):
-        # Se não conseguir comparar, verifica se tem ra
-        if hasattr(docente, "ra") and docente.ra is not None:
-            raise PermissaoNegada()
+    if str(docente.ra) != str(ra_usuario):
+        raise PermissaoNegada()
 
     return docente
 
 
+def _validar_atualizacao_docente(
+    db: Session, id_docente: int, ra_usuario: str, email: str
+) -> None:
+    """Valida existência, posse e email único do docente em uma única query."""
+    ra_docente, email_em_uso = crud.verificar_atualizacao_docente(db, id_docente, email)
+    if ra_docente is None:
+        raise DocenteNaoEncontrado()
+    if ra_docente != ra_usuario:
+        raise PermissaoNegada()
+    if email_em_uso:
+        raise EmailDuplicado()
+
+
 def _validar_email_unico(
     db: Session, email: str, id_docente_atual: int | None = None
 ) -> None:
     """Valida se email já está em uso por outro docente. Lança exceção se duplicado."""
-    docente_existente = crud.obter_docente_por_email(db, email)
-
-    if docente_existente is None:
-        return
-
-    # Se o email pertence ao mesmo docente, não é duplicação
-    if id_docente_atual is not None:
-        try:
-            id_existente = int(str(docente_existente.id_docente))
-            if id_existente == id_docente_atual:
-                return
-        except (ValueError, TypeError):
-            pass
-
-    raise EmailDuplicado()
+    if crud.email_docente_em_uso(db, email, id_docente_atual):
+        raise EmailDuplicado()
 
 
 @router.post(
@@ -139,7 +134,7 @@ def _validar_email_unico(
 )
 def criar_docente(
     docente: schemas.DocenteCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -165,13 +160,6 @@ def criar_docente(
     try:
         _validar_email_unico(db, docente.email)
 
-        # Obter RA do usuário autenticado
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-
         # Criar docente diretamente com RA no banco de dados
         db_docente = models.Docente(
             nome=docente.nome,
@@ -181,7 +169,6 @@ def criar_docente(
         )
         db.add(db_docente)
         db.commit()
-        db.refresh(db_docente)
 
         return schemas.GenericResponse(
             data=db_docente, success=True, message="Docente criado com sucesso"
@@ -194,9 +181,12 @@ def criar_docente(
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Docente])
 def listar_docentes(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -208,6 +198,8 @@ def listar_docentes(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
 
     **Restrições:**
     - Usuário só pode listar seus próprios docentes
@@ -216,32 +208,26 @@ def listar_docentes(
     - 200: Lista de docentes retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    # Obter RA do usuário autenticado
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
 
-    # Listar apenas docentes do usuário autenticado
-    docentes = (
-        db.query(models.Docente)
-        .filter(models.Docente.ra == ra_usuario)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Listar apenas docentes do usuário autenticado (página e total em uma query)
+    docentes, total = crud.obter_docentes_por_usuario_com_total(
+        db, ra_usuario, skip, limit, after_id
     )
-    total = db.query(models.Docente).filter(models.Docente.ra == ra_usuario).count()
 
     return schemas.GenericListResponse(
-        data=docentes, total=total, skip=skip, limit=limit, success=True
+        data=docentes,
+        total=total,
+        skip=skip,
+        limit=limit,
+        next_cursor=proximo_cursor(docentes, limit, "id_docente"),
+        success=True,
     )
 
 
 @router.get("/{id_docente}", response_model=schemas.GenericResponse[schemas.Docente])
 def obter_docente(
     id_docente: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -262,11 +248,6 @@ def obter_docente(
     - 404: Docente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     docente = _validar_docente_pertence_usuario(db, id_docente, ra_usuario)
     return schemas.GenericResponse(data=docente, success=True)
 
@@ -275,7 +256,7 @@ def obter_docente(
 def atualizar_docente(
     id_docente: int,
     docente: schemas.DocenteCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -305,13 +286,7 @@ def atualizar_docente(
     - 401: Token ausente ou inválido
     """
     try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
-        _validar_docente_pertence_usuario(db, id_docente, ra_usuario)
-        _validar_email_unico(db, docente.email, id_docente)
+        _validar_atualizacao_docente(db, id_docente, ra_usuario, docente.email)
 
         db_atualizado = crud.atualizar_docente(db, id_docente, docente)
         return schemas.GenericResponse(
@@ -327,7 +302,7 @@ def atualizar_docente(
 def atualizar_parcial_docente(
     id_docente: int,
     docente_update: DocenteUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -357,11 +332,6 @@ def atualizar_parcial_docente(
     - 401: Token ausente ou inválido
     """
     try:
-        ra_usuario = (
-            usuario_autenticado.ra
-            if hasattr(usuario_autenticado, "ra")
-            else usuario_autenticado
-        )
         docente_existente = _validar_docente_pertence_usuario(
             db, id_docente, ra_usuario
         )
@@ -404,7 +374,7 @@ def atualizar_parcial_docente(
 @router.delete("/{id_docente}", response_model=schemas.GenericResponse[dict])
 def deletar_docente(
     id_docente: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -426,11 +396,6 @@ def deletar_docente(
     - 404: Docente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     _validar_docente_pertence_usuario(db, id_docente, ra_usuario)
 
     if crud.deletar_docente(db, id_docente):
@@ -446,7 +411,7 @@ def deletar_docente(
 @router.get("/email/{email}", response_model=schemas.GenericResponse[schemas.Docente])
 def obter_docente_por_email(
     email: str,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -467,23 +432,13 @@ def obter_docente_por_email(
     - 404: Docente não encontrado
     - 401: Token ausente ou inválido
     """
-    ra_usuario = (
-        usuario_autenticado.ra
-        if hasattr(usuario_autenticado, "ra")
-        else usuario_autenticado
-    )
     docente = crud.obter_docente_por_email(db, email)
 
     if not docente:
         raise DocenteNaoEncontrado()
 
     # Verificar se pertence ao usuário (comparar por RA)
-    try:
-        ra_docente = str(docente.ra) if hasattr(docente, "ra") else None
-        if ra_docente and ra_docente != ra_usuario:
-            raise PermissaoNegada()
-    except (ValueError, TypeError, AttributeError):
-        if hasattr(docente, "ra") and docente.ra is not None:
-            raise PermissaoNegada()
+    if str(docente.ra) != str(ra_usuario):
+        raise PermissaoNegada()
 
     return schemas.GenericResponse(data=docente, success=True)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from .. import constants
+from .. import cache, constants
+from ..auth import obter_ra_autenticado
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -36,3 +37,26 @@ def health_check():
     ```
     """
     return {"status": "healthy", "version": constants.API_VERSION}
+
+
+@router.get("/cache", tags=["Health"])
+def estatisticas_cache(ra_usuario: str = Depends(obter_ra_autenticado)):
+    """
+    Estatísticas dos caches em memória deste processo.
+
+    **Autenticação:**
+    - Requer token JWT no header `Authorization: Bearer <token>`
+
+    **Respostas:**
+    - 200: Acertos, faltas e taxa de acerto de cada cache (vazio até o
+      primeiro acesso)
+    - 401: Token ausente ou inválido
+
+    **Exemplo de Resposta:**
+    ```json
+    {
+      "anotacao": {"acertos": 42, "faltas": 8, "taxa_acerto": 0.84}
+    }
+    ```
+    """
+    return cache.estatisticas()
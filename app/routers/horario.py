@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from ..database import get_db
-from ..auth import verificar_token
-from .. import models, schemas
+from ..auth import obter_ra_autenticado
+from .. import crud, models, schemas
+from ..utils import gerar_etag, proximo_cursor, responder_se_nao_modificado
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -63,9 +65,7 @@ class PermissaoNegada(HTTPException):
 
 def _validar_horario_existe(db: Session, id_horario: int) -> models.Horario:
     """Valida se horário existe. Retorna horário ou lança exceção."""
-    horario = (
-        db.query(models.Horario).filter(models.Horario.id_horario == id_horario).first()
-    )
+    horario = crud.obter_horario(db, id_horario)
     if not horario:
         raise HorarioNaoEncontrado()
     return horario
@@ -104,21 +104,17 @@ def _validar_dia_semana(dia_semana: int) -> int:
     return dia_semana
 
 
-def _aplicar_atualizacoes_parciais(
-    horario: models.Horario, dados_atualizacao: schemas.HorarioUpdate
-) -> models.Horario:
-    """Aplica atualizações parciais ao horário com early returns."""
-    update_data = dados_atualizacao.model_dump(exclude_unset=True)
-
-    for campo, valor in update_data.items():
-        if valor is not None:
-            if campo == "numero_aula":
-                valor = _validar_numero_aula(valor)
-            elif campo == "dia_semana":
-                valor = _validar_dia_semana(valor)
-            setattr(horario, campo, valor)
+def _validar_posse_horario(db: Session, id_horario: int, ra_usuario: str) -> None:
+    """
+    Valida existência e posse lendo só o RA do horário (uma query, sem o registro).
 
-    return horario
+    Usado depois de um UPDATE/DELETE filtrado por RA que não afetou nenhuma linha.
+    """
+    ra_horario = crud.obter_ra_horario(db, id_horario)
+    if ra_horario is None:
+        raise HorarioNaoEncontrado()
+    if ra_horario != ra_usuario:
+        raise PermissaoNegada()
 
 
 # ============================================================================
@@ -131,7 +127,7 @@ def _aplicar_atualizacoes_parciais(
 )
 def criar_horario(
     horario: schemas.HorarioCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -163,7 +159,7 @@ def criar_horario(
 
         # Criar e persistir horário com RA do usuário autenticado
         novo_horario = models.Horario(
-            ra=usuario_autenticado.ra,
+            ra=ra_usuario,
             dia_semana=horario.dia_semana,
             numero_aula=horario.numero_aula,
             disciplina=horario.disciplina,
@@ -171,7 +167,6 @@ def criar_horario(
 
         db.add(novo_horario)
         db.commit()
-        db.refresh(novo_horario)
 
         return schemas.GenericResponse(
             data=novo_horario,
@@ -191,9 +186,14 @@ def criar_horario(
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Horario])
 def listar_todos_horarios(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    request: Request,
+    response: Response,
+    ra: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -205,30 +205,41 @@ def listar_todos_horarios(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
+
+    **Cache HTTP:**
+    - A resposta traz `ETag`; reenvie-o em `If-None-Match` para receber 304
+      sem corpo enquanto os registros não mudarem
 
     **Respostas:**
     - 200: Lista de horários retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    horarios = (
-        db.query(models.Horario)
-        .filter(models.Horario.ra == usuario_autenticado.ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    if "if-none-match" in request.headers:
+        # Revalidação: o agregado basta para decidir o 304 sem buscar a página
+        total, versao = crud.obter_versao_por_usuario(db, models.Horario, ra)
+        horarios = None
+    else:
+        # Página, total e versão em uma única query (funções de janela)
+        horarios, total, versao = crud.obter_horarios_por_usuario_com_versao(
+            db, ra, skip, limit, after_id
+        )
 
-    total = (
-        db.query(models.Horario)
-        .filter(models.Horario.ra == usuario_autenticado.ra)
-        .count()
-    )
+    etag = gerar_etag(ra, "horario", versao, skip, limit, after_id)
+    nao_modificado = responder_se_nao_modificado(request, response, etag)
+    if nao_modificado:
+        return nao_modificado
+
+    if horarios is None:
+        horarios = crud.obter_horarios_por_usuario(db, ra, skip, limit, after_id)
 
     return schemas.GenericListResponse(
         data=horarios,
         total=total,
         skip=skip,
         limit=limit,
+        next_cursor=proximo_cursor(horarios, limit, "id_horario"),
         success=True,
         message="Horários retornados com sucesso",
     )
@@ -237,7 +248,7 @@ def listar_todos_horarios(
 @router.get("/{id_horario}", response_model=schemas.GenericResponse[schemas.Horario])
 def obter_horario(
     id_horario: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -258,9 +269,7 @@ def obter_horario(
     - 404: Horário não encontrado
     - 401: Token ausente ou inválido
     """
-    horario = _validar_horario_pertence_usuario(
-        db, id_horario, str(usuario_autenticado.ra)
-    )
+    horario = _validar_horario_pertence_usuario(db, id_horario, ra_usuario)
 
     return schemas.GenericResponse(
         data=horario,
@@ -274,9 +283,12 @@ def obter_horario(
 )
 def listar_horarios_por_dia(
     dia_semana: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -291,6 +303,8 @@ def listar_horarios_por_dia(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
 
     **Restrições:**
     - Usuário só pode listar seus próprios horários
@@ -299,24 +313,9 @@ def listar_horarios_por_dia(
     - 200: Lista de horários retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    horarios = (
-        db.query(models.Horario)
-        .filter(
-            models.Horario.ra == usuario_autenticado.ra,
-            models.Horario.dia_semana == dia_semana,
-        )
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    total = (
-        db.query(models.Horario)
-        .filter(
-            models.Horario.ra == usuario_autenticado.ra,
-            models.Horario.dia_semana == dia_semana,
-        )
-        .count()
+    # Página e total em uma única query (COUNT(*) OVER ())
+    horarios, total = crud.obter_horarios_por_dia_com_total(
+        db, ra_usuario, dia_semana, skip, limit, after_id
     )
 
     return schemas.GenericListResponse(
@@ -324,6 +323,7 @@ def listar_horarios_por_dia(
         total=total,
         skip=skip,
         limit=limit,
+        next_cursor=proximo_cursor(horarios, limit, "id_horario"),
         success=True,
         message="Horários retornados com sucesso",
     )
@@ -338,7 +338,7 @@ def listar_horarios_por_dia(
 def atualizar_horario(
     id_horario: int,
     horario_update: schemas.HorarioUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -363,22 +363,18 @@ def atualizar_horario(
     - 401: Token ausente ou inválido
     """
     try:
-        horario_existente = _validar_horario_pertence_usuario(
-            db, id_horario, str(usuario_autenticado.ra)
-        )
-
         # Verificar se há dados para atualizar
-        update_data = horario_update.model_dump(exclude_unset=True)
-        if not update_data:
+        if not horario_update.model_fields_set:
             raise ErroAoAtualizarHorario("Nenhum dado fornecido para atualização")
 
-        # Aplicar atualizações
-        horario_atualizado = _aplicar_atualizacoes_parciais(
-            horario_existente, horario_update
+        # UPDATE filtrado por id e RA (o registro não é carregado antes)
+        horario_atualizado = crud.atualizar_horario_parcial(
+            db, id_horario, horario_update, ra=ra_usuario
         )
-
-        db.commit()
-        db.refresh(horario_atualizado)
+        if horario_atualizado is None:
+            # Nada atualizado: distingue horário inexistente (404) de alheio (403)
+            _validar_posse_horario(db, id_horario, ra_usuario)
+            raise HorarioNaoEncontrado()
 
         return schemas.GenericResponse(
             data=horario_atualizado,
@@ -395,7 +391,7 @@ def atualizar_horario(
 def atualizar_parcial_horario(
     id_horario: int,
     horario_update: schemas.HorarioUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -424,22 +420,18 @@ def atualizar_parcial_horario(
     - 401: Token ausente ou inválido
     """
     try:
-        horario_existente = _validar_horario_pertence_usuario(
-            db, id_horario, str(usuario_autenticado.ra)
-        )
-
         # Verificar se há dados para atualizar
-        update_data = horario_update.model_dump(exclude_unset=True)
-        if not update_data:
+        if not horario_update.model_fields_set:
             raise ErroAoAtualizarHorario("Nenhum dado fornecido para atualização")
 
-        # Aplicar atualizações
-        horario_atualizado = _aplicar_atualizacoes_parciais(
-            horario_existente, horario_update
+        # UPDATE filtrado por id e RA (o registro não é carregado antes)
+        horario_atualizado = crud.atualizar_horario_parcial(
+            db, id_horario, horario_update, ra=ra_usuario
         )
-
-        db.commit()
-        db.refresh(horario_atualizado)
+        if horario_atualizado is None:
+            # Nada atualizado: distingue horário inexistente (404) de alheio (403)
+            _validar_posse_horario(db, id_horario, ra_usuario)
+            raise HorarioNaoEncontrado()
 
         return schemas.GenericResponse(
             data=horario_atualizado,
@@ -460,7 +452,7 @@ def atualizar_parcial_horario(
 @router.delete("/{id_horario}", response_model=schemas.GenericResponse[dict])
 def deletar_horario(
     id_horario: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -483,18 +475,18 @@ def deletar_horario(
     - 404: Horário não encontrado
     - 401: Token ausente ou inválido
     """
-    horario_existente = _validar_horario_pertence_usuario(
-        db, id_horario, str(usuario_autenticado.ra)
-    )
-
     try:
-        db.delete(horario_existente)
-        db.commit()
-
-        return schemas.GenericResponse(
-            data={"id_deletado": id_horario},
-            success=True,
-            message="Horário deletado com sucesso",
-        )
+        removido = crud.deletar_horario(db, id_horario, ra_usuario)
     except Exception:
         raise ErroAoDeletarHorario()
+
+    if not removido:
+        # Nada removido: distingue horário inexistente (404) de alheio (403)
+        _validar_posse_horario(db, id_horario, ra_usuario)
+        raise HorarioNaoEncontrado()
+
+    return schemas.GenericResponse(
+        data={"id_deletado": id_horario},
+        success=True,
+        message="Horário deletado com sucesso",
+    )
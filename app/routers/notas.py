@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from ..database import get_db
-from ..auth import verificar_token
-from .. import models, schemas
+from ..auth import obter_ra_autenticado
+from .. import crud, models, schemas
+from ..utils import gerar_etag, proximo_cursor, responder_se_nao_modificado
 
 # ============================================================================
 # CONFIGURAÇÃO DO ROUTER
@@ -47,6 +49,15 @@ class ErroAoDeletarNota(HTTPException):
         super().__init__(status_code=400, detail="Erro ao deletar nota")
 
 
+class PermissaoNegada(HTTPException):
+    """Usuário não tem permissão para acessar esta nota"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=403, detail="Você não tem permissão para acessar esta nota"
+        )
+
+
 # ============================================================================
 # VALIDADORES (Responsabilidade Única)
 # ============================================================================
@@ -54,7 +65,7 @@ class ErroAoDeletarNota(HTTPException):
 
 def _validar_nota_existe(db: Session, id_nota: int) -> models.Nota:
     """Valida se nota existe. Retorna nota ou lança exceção."""
-    nota = db.query(models.Nota).filter(models.Nota.id_nota == id_nota).first()
+    nota = crud.obter_nota(db, id_nota)
     if not nota:
         raise NotaNaoEncontrada()
     return nota
@@ -68,24 +79,22 @@ def _validar_nota_pertence_usuario(
 
     # Verificar se a nota pertence ao usuário autenticado (comparar por RA)
     if str(nota.ra) != str(ra_usuario):
-        raise HTTPException(
-            status_code=403, detail="Você não tem permissão para acessar esta nota"
-        )
+        raise PermissaoNegada()
 
     return nota
 
 
-def _aplicar_atualizacoes_parciais(
-    nota: models.Nota, dados_atualizacao: schemas.NotaUpdate
-) -> models.Nota:
-    """Aplica atualizações parciais à nota com early returns."""
-    update_data = dados_atualizacao.model_dump(exclude_unset=True)
-
-    for campo, valor in update_data.items():
-        if valor is not None:
-            setattr(nota, campo, valor)
+def _validar_posse_nota(db: Session, id_nota: int, ra_usuario: str) -> None:
+    """
+    Valida existência e posse lendo só o RA da nota (uma query, sem o registro).
 
-    return nota
+    Usado depois de um UPDATE/DELETE filtrado por RA que não afetou nenhuma linha.
+    """
+    ra_nota = crud.obter_ra_nota(db, id_nota)
+    if ra_nota is None:
+        raise NotaNaoEncontrada()
+    if ra_nota != ra_usuario:
+        raise PermissaoNegada()
 
 
 def _contar_notas(db: Session, query_filter=None) -> int:
@@ -104,7 +113,7 @@ def _contar_notas(db: Session, query_filter=None) -> int:
 @router.post("/", response_model=schemas.GenericResponse[schemas.Nota], status_code=201)
 def criar_nota(
     nota: schemas.NotaCreate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -129,7 +138,7 @@ def criar_nota(
     try:
         # Criar e persistir nota com RA do usuário autenticado
         nova_nota = models.Nota(
-            ra=usuario_autenticado.ra,
+            ra=ra_usuario,
             bimestre=nota.bimestre,
             nota=nota.nota,
             disciplina=nota.disciplina,
@@ -137,7 +146,6 @@ def criar_nota(
 
         db.add(nova_nota)
         db.commit()
-        db.refresh(nova_nota)
 
         return schemas.GenericResponse(
             data=nova_nota,
@@ -157,9 +165,14 @@ def criar_nota(
 
 @router.get("/", response_model=schemas.GenericListResponse[schemas.Nota])
 def listar_todas_notas(
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    request: Request,
+    response: Response,
+    ra: str = Depends(obter_ra_autenticado),
     skip: int = Query(0, ge=0, description="Paginação: saltar registros"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Paginação keyset: ID do último registro recebido"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -171,28 +184,41 @@ def listar_todas_notas(
     **Query Parameters:**
     - `skip` (int): Número de registros a saltar. Padrão: 0
     - `limit` (int): Número máximo de registros por página. Padrão: 100, Máximo: 1000
+    - `after_id` (int, opcional): ID do último registro da página anterior
+      (paginação keyset, preferível a `skip`; ver `next_cursor` na resposta)
+
+    **Cache HTTP:**
+    - A resposta traz `ETag`; reenvie-o em `If-None-Match` para receber 304
+      sem corpo enquanto os registros não mudarem
 
     **Respostas:**
     - 200: Lista de notas retornada com sucesso
     - 401: Token ausente ou inválido
     """
-    notas = (
-        db.query(models.Nota)
-        .filter(models.Nota.ra == usuario_autenticado.ra)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    if "if-none-match" in request.headers:
+        # Revalidação: o agregado basta para decidir o 304 sem buscar a página
+        total, versao = crud.obter_versao_por_usuario(db, models.Nota, ra)
+        notas = None
+    else:
+        # Página, total e versão em uma única query (funções de janela)
+        notas, total, versao = crud.obter_notas_por_usuario_com_versao(
+            db, ra, skip, limit, after_id
+        )
 
-    total = (
-        db.query(models.Nota).filter(models.Nota.ra == usuario_autenticado.ra).count()
-    )
+    etag = gerar_etag(ra, "nota", versao, skip, limit, after_id)
+    nao_modificado = responder_se_nao_modificado(request, response, etag)
+    if nao_modificado:
+        return nao_modificado
+
+    if notas is None:
+        notas = crud.obter_notas_por_usuario(db, ra, skip, limit, after_id)
 
     return schemas.GenericListResponse(
         data=notas,
         total=total,
         skip=skip,
         limit=limit,
+        next_cursor=proximo_cursor(notas, limit, "id_nota"),
         success=True,
         message="Notas retornadas com sucesso",
     )
@@ -201,7 +227,7 @@ def listar_todas_notas(
 @router.get("/{id_nota}", response_model=schemas.GenericResponse[schemas.Nota])
 def obter_nota(
     id_nota: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -222,7 +248,7 @@ def obter_nota(
     - 404: Nota não encontrada
     - 401: Token ausente ou inválido
     """
-    nota = _validar_nota_pertence_usuario(db, id_nota, str(usuario_autenticado.ra))
+    nota = _validar_nota_pertence_usuario(db, id_nota, ra_usuario)
 
     return schemas.GenericResponse(
         data=nota,
@@ -240,7 +266,7 @@ def obter_nota(
 def atualizar_nota(
     id_nota: int,
     nota_update: schemas.NotaUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -268,22 +294,21 @@ def atualizar_nota(
     - 401: Token ausente ou inválido
     """
     try:
-        nota_existente = _validar_nota_pertence_usuario(
-            db, id_nota, str(usuario_autenticado.ra)
+        # UPDATE filtrado por id e RA (o registro não é carregado antes)
+        nota_atualizada = crud.atualizar_nota_parcial(
+            db, id_nota, nota_update, ra=ra_usuario
         )
-
-        # Aplicar atualizações
-        nota_atualizada = _aplicar_atualizacoes_parciais(nota_existente, nota_update)
-
-        db.commit()
-        db.refresh(nota_atualizada)
+        if nota_atualizada is None:
+            # Nada atualizado: distingue nota inexistente (404) de alheia (403)
+            _validar_posse_nota(db, id_nota, ra_usuario)
+            raise NotaNaoEncontrada()
 
         return schemas.GenericResponse(
             data=nota_atualizada,
             success=True,
             message="Nota atualizada com sucesso",
         )
-    except (NotaNaoEncontrada, ErroAoAtualizarNota):
+    except (NotaNaoEncontrada, ErroAoAtualizarNota, PermissaoNegada):
         raise
     except Exception as e:
         raise ErroAoAtualizarNota(str(e))
@@ -293,7 +318,7 @@ def atualizar_nota(
 def atualizar_parcial_nota(
     id_nota: int,
     nota_update: schemas.NotaUpdate,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -322,27 +347,25 @@ def atualizar_parcial_nota(
     - 401: Token ausente ou inválido
     """
     try:
-        nota_existente = _validar_nota_pertence_usuario(
-            db, id_nota, str(usuario_autenticado.ra)
-        )
-
         # Verificar se há dados para atualizar
-        update_data = nota_update.model_dump(exclude_unset=True)
-        if not update_data:
+        if not nota_update.model_fields_set:
             raise ErroAoAtualizarNota("Nenhum dado fornecido para atualização")
 
-        # Aplicar atualizações
-        nota_atualizada = _aplicar_atualizacoes_parciais(nota_existente, nota_update)
-
-        db.commit()
-        db.refresh(nota_atualizada)
+        # UPDATE filtrado por id e RA (o registro não é carregado antes)
+        nota_atualizada = crud.atualizar_nota_parcial(
+            db, id_nota, nota_update, ra=ra_usuario
+        )
+        if nota_atualizada is None:
+            # Nada atualizado: distingue nota inexistente (404) de alheia (403)
+            _validar_posse_nota(db, id_nota, ra_usuario)
+            raise NotaNaoEncontrada()
 
         return schemas.GenericResponse(
             data=nota_atualizada,
             success=True,
             message="Nota atualizada parcialmente com sucesso",
         )
-    except (NotaNaoEncontrada, ErroAoAtualizarNota):
+    except (NotaNaoEncontrada, ErroAoAtualizarNota, PermissaoNegada):
         raise
     except Exception as e:
         raise ErroAoAtualizarNota(str(e))
@@ -356,7 +379,7 @@ def atualizar_parcial_nota(
 @router.delete("/{id_nota}", response_model=schemas.GenericResponse[dict])
 def deletar_nota(
     id_nota: int,
-    usuario_autenticado: models.Usuario = Depends(verificar_token),
+    ra_usuario: str = Depends(obter_ra_autenticado),
     db: Session = Depends(get_db),
 ):
     """
@@ -379,18 +402,18 @@ def deletar_nota(
     - 404: Nota não encontrada
     - 401: Token ausente ou inválido
     """
-    nota_existente = _validar_nota_pertence_usuario(
-        db, id_nota, str(usuario_autenticado.ra)
-    )
-
     try:
-        db.delete(nota_existente)
-        db.commit()
-
-        return schemas.GenericResponse(
-            data={"id_deletado": id_nota},
-            success=True,
-            message="Nota deletada com sucesso",
-        )
+        removido = crud.deletar_nota(db, id_nota, ra_usuario)
     except Exception:
         raise ErroAoDeletarNota()
+
+    if not removido:
+        # Nada removido: distingue nota inexistente (404) de alheia (403)
+        _validar_posse_nota(db, id_nota, ra_usuario)
+        raise NotaNaoEncontrada()
+
+    return schemas.GenericResponse(
+        data={"id_deletado": id_nota},
+        success=True,
+        message="Nota deletada com sucesso",
+    )
@@ -82,9 +82,16 @@ def _anexar_nomes_usuarios_lista(usuarios: list) -> list:
     return [_anexar_nomes_usuario(u) for u in usuarios]
 
 
-def _validar_usuario_existe(db: Session, id_usuario: int) -> models.Usuario:
-    """Valida se usuário existe. Retorna usuário ou lança exceção."""
-    usuario = crud.obter_usuario(db, id_usuario)
+def _validar_usuario_existe(
+    db: Session, id_usuario: int, completo: bool = False
+) -> models.Usuario:
+    """
+    Valida se usuário existe. Retorna usuário ou lança exceção.
+
+    Com `completo=True` já carrega instituição e curso (para _anexar_nomes_usuario).
+    """
+    obter = crud.obter_usuario_completo if completo else crud.obter_usuario
+    usuario = obter(db, id_usuario)
     if not usuario:
         raise UsuarioNaoEncontrado()
     return usuario
@@ -273,12 +280,8 @@ def obter_perfil_autenticado(
     - 404: Usuário não encontrado
     - 401: Token ausente ou inválido
     """
-    id_usuario = (
-        usuario_autenticado.id_usuario
-        if hasattr(usuario_autenticado, "id_usuario")
-        else usuario_autenticado
-    )
-    usuario = _validar_usuario_existe(db, id_usuario)
+    id_usuario = usuario_autenticado.id_usuario
+    usuario = _validar_usuario_existe(db, id_usuario, completo=True)
     _anexar_nomes_usuario(usuario)
     return schemas.GenericResponse(data=usuario, success=True)
 
@@ -327,7 +330,7 @@ def obter_usuario_por_id(
     - 200: Usuário retornado com sucesso
     - 404: Usuário não encontrado
     """
-    usuario = _validar_usuario_existe(db, id_usuario)
+    usuario = _validar_usuario_existe(db, id_usuario, completo=True)
     _anexar_nomes_usuario(usuario)
     return schemas.GenericResponse(data=usuario, success=True)
 
@@ -467,11 +470,7 @@ def atualizar_usuario(
     - 401: Token ausente ou inválido
     """
     try:
-        id_usuario = (
-            usuario_autenticado.id_usuario
-            if hasattr(usuario_autenticado, "id_usuario")
-            else usuario_autenticado
-        )
+        id_usuario = usuario_autenticado.id_usuario
         usuario_atualizado = crud.atualizar_usuario(db, id_usuario, usuario)
         if usuario_atualizado:
             _anexar_nomes_usuario(usuario_atualizado)
@@ -517,11 +516,7 @@ def atualizar_usuario_parcial(
     - 401: Token ausente ou inválido
     """
     try:
-        id_usuario = (
-            usuario_autenticado.id_usuario
-            if hasattr(usuario_autenticado, "id_usuario")
-            else usuario_autenticado
-        )
+        id_usuario = usuario_autenticado.id_usuario
         usuario_atualizado = crud.atualizar_usuario(db, id_usuario, usuario)
         if usuario_atualizado:
             _anexar_nomes_usuario(usuario_atualizado)
@@ -559,11 +554,7 @@ def deletar_usuario(
     - 400: Erro ao deletar usuário
     - 401: Token ausente ou inválido
     """
-    id_usuario = (
-        usuario_autenticado.id_usuario
-        if hasattr(usuario_autenticado, "id_usuario")
-        else usuario_autenticado
-    )
+    id_usuario = usuario_autenticado.id_usuario
     if crud.deletar_usuario(db, id_usuario):
         return schemas.GenericResponse(
             data={"id_deletado": id_usuario},
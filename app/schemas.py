@@ -107,6 +107,7 @@ class GenericListResponse(BaseSchema, Generic[T]):
     total: Optional[int] = None
     skip: Optional[int] = None
     limit: Optional[int] = None
+    next_cursor: Optional[int] = None  # after_id da próxima página (keyset)
 
 
 # ============================================================================
@@ -444,6 +445,19 @@ class AnotacaoCreate(BaseSchema):
     )
 
 
+class AnotacaoUpdate(BaseSchema):
+    titulo: Optional[str] = Field(
+        None,
+        min_length=constants.TITULO_ANOTACAO_MIN_LENGTH,
+        max_length=constants.TITULO_ANOTACAO_MAX_LENGTH,
+    )
+    anotacao: Optional[str] = Field(
+        None,
+        min_length=constants.ANOTACAO_MIN_LENGTH,
+        max_length=constants.ANOTACAO_MAX_LENGTH,
+    )
+
+
 class Anotacao(BaseSchema):
     id_anotacao: int
     ra: RA
@@ -13,6 +13,9 @@ from .validators import (
     extrair_ra_usuario,
     validar_intervalo_numerico,
 )
+from .paginacao import proximo_cursor
+from .etag import gerar_etag, responder_se_nao_modificado
+from .resposta import resposta_item, resposta_lista
 
 __all__ = [
     "validar_ra",
@@ -24,4 +27,9 @@ __all__ = [
     "validar_modulo",
     "extrair_ra_usuario",
     "validar_intervalo_numerico",
+    "proximo_cursor",
+    "gerar_etag",
+    "responder_se_nao_modificado",
+    "resposta_item",
+    "resposta_lista",
 ]
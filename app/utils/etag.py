@@ -0,0 +1,46 @@
+"""
+Utilitários de cache HTTP (ETag / If-None-Match).
+
+Permitem que as listagens respondam 304 Not Modified sem buscar os registros.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def gerar_etag(*partes) -> str:
+    """
+    Gera um ETag forte a partir das partes que identificam a resposta.
+
+    Args:
+        *partes: Valores que determinam o corpo (usuário, recurso, versão, página)
+
+    Returns:
+        str: ETag entre aspas, pronto para o header
+    """
+    chave = "|".join(str(parte) for parte in partes).encode("utf-8")
+    return f'"{hashlib.blake2b(chave, digest_size=16).hexdigest()}"'
+
+
+def responder_se_nao_modificado(
+    request: Request, response: Response, etag: str
+) -> Optional[Response]:
+    """
+    Aplica o ETag na resposta e verifica o `If-None-Match` do cliente.
+
+    Returns:
+        Response | None: Resposta 304 se o cliente já tem esta versão; senão
+        None, e o endpoint segue montando a resposta normalmente
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    enviados = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in enviados or "*" in enviados:
+        return Response(status_code=304, headers=headers)
+    return None
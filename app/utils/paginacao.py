@@ -0,0 +1,27 @@
+"""
+Utilitários de paginação.
+
+Suporte à paginação keyset (`after_id`) usada pelos endpoints de listagem.
+"""
+
+from typing import Optional, Sequence
+
+
+def proximo_cursor(itens: Sequence, limit: int, atributo_id: str) -> Optional[int]:
+    """
+    Calcula o cursor da próxima página (keyset).
+
+    Retorna o ID do último item quando a página veio cheia; o cliente o envia
+    como `after_id` na próxima requisição. Página incompleta = fim da lista.
+
+    Args:
+        itens: Registros retornados na página atual
+        limit: Tamanho máximo da página solicitado
+        atributo_id: Nome do atributo de chave primária dos registros
+
+    Returns:
+        int | None: ID a ser usado como `after_id` ou None se não há mais páginas
+    """
+    if not itens or len(itens) < limit:
+        return None
+    return getattr(itens[-1], atributo_id)
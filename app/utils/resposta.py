@@ -0,0 +1,84 @@
+"""
+Utilitários de resposta JSON.
+
+Serializam respostas direto das linhas do banco (Row ou instância ORM), sem
+instanciar nem revalidar um modelo Pydantic por registro.
+"""
+
+from typing import Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from .paginacao import proximo_cursor
+
+
+def resposta_item(
+    linha, schema: Type[BaseModel], message: Optional[str] = None
+) -> ORJSONResponse:
+    """
+    Monta o corpo de `GenericResponse` a partir de uma linha e o serializa com orjson.
+
+    A linha já vem tipada do banco, então os campos de `schema` são copiados
+    sem passar pelos validadores (o `response_model` da rota continua só
+    documentando o formato).
+
+    Args:
+        linha: Registro retornado (Row ou instância do modelo)
+        schema: Schema do item; define os campos serializados
+        message: Mensagem opcional da resposta
+
+    Returns:
+        ORJSONResponse: Resposta com `data`, `success` e `message`
+    """
+    conteudo = {
+        "data": {campo: getattr(linha, campo) for campo in schema.model_fields},
+        "success": True,
+        "message": message,
+    }
+    return ORJSONResponse(conteudo)
+
+
+def resposta_lista(
+    response: Response,
+    linhas: Sequence,
+    schema: Type[BaseModel],
+    atributo_id: str,
+    total: Optional[int],
+    skip: int,
+    limit: int,
+) -> ORJSONResponse:
+    """
+    Monta o corpo de `GenericListResponse` a partir das linhas e o serializa com orjson.
+
+    Cada linha é projetada nos campos de `schema` (colunas extras da query,
+    como agregados de janela, ficam de fora). Os headers já aplicados em
+    `response` (ex.: ETag) são copiados, pois o FastAPI os ignora quando o
+    endpoint retorna uma Response pronta.
+
+    Args:
+        response: Response injetada no endpoint (fonte dos headers)
+        linhas: Linhas da página (Row ou instâncias do modelo)
+        schema: Schema de cada item; define os campos serializados
+        atributo_id: Nome da chave primária, usada no `next_cursor`
+        total: Total de registros do usuário
+        skip: Registros saltados
+        limit: Tamanho máximo da página
+
+    Returns:
+        ORJSONResponse: Resposta com `data`, `total`, `skip`, `limit` e `next_cursor`
+    """
+    campos = tuple(schema.model_fields)
+    conteudo = {
+        "data": [
+            {campo: getattr(linha, campo) for campo in campos} for linha in linhas
+        ],
+        "success": True,
+        "message": None,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": proximo_cursor(linhas, limit, atributo_id),
+    }
+    return ORJSONResponse(conteudo, headers=dict(response.headers))
@@ -8,6 +8,19 @@ eliminando duplicação de código e garantindo consistência.
 from typing import Optional
 from .. import constants
 
+# Limites lidos uma única vez no import (evita lookups em `constants` por chamada)
+_TELEFONE_MIN = constants.TELEFONE_MIN_LENGTH
+_TELEFONE_MAX = constants.TELEFONE_MAX_LENGTH
+_EMAIL_MAX = constants.EMAIL_MAX_LENGTH
+_NUMERO_AULA_MIN = constants.NUMERO_AULA_MIN
+_NUMERO_AULA_MAX = constants.NUMERO_AULA_MAX
+_DIA_SEMANA_MIN = constants.DIA_SEMANA_MIN
+_DIA_SEMANA_MAX = constants.DIA_SEMANA_MAX
+_BIMESTRE_MIN = constants.BIMESTRE_MIN
+_BIMESTRE_MAX = constants.BIMESTRE_MAX
+_MODULO_MIN = constants.MODULO_MIN
+_MODULO_MAX = constants.MODULO_MAX
+
 
 def validar_ra(ra: str) -> str:
     """
@@ -63,16 +76,16 @@ def validar_telefone(telefone: Optional[str]) -> Optional[str]:
 
     # Verificar formato internacional com '+'
     if telefone.startswith("+"):
-        if len(telefone) < constants.TELEFONE_MIN_LENGTH:
+        if len(telefone) < _TELEFONE_MIN:
             raise ValueError(constants.MSG_TELEFONE_INVALIDO)
         return telefone
 
     # Verificar comprimento mínimo para formato sem '+'
-    if len(telefone) < constants.TELEFONE_MIN_LENGTH:
+    if len(telefone) < _TELEFONE_MIN:
         raise ValueError(constants.MSG_TELEFONE_INVALIDO)
 
     # Verificar comprimento máximo
-    if len(telefone) > constants.TELEFONE_MAX_LENGTH:
+    if len(telefone) > _TELEFONE_MAX:
         raise ValueError(constants.MSG_TELEFONE_INVALIDO)
 
     return telefone
@@ -99,10 +112,8 @@ def validar_email(email: str) -> str:
     if not email:
         raise ValueError(constants.MSG_EMAIL_NAO_VALIDO)
 
-    if len(email) > constants.EMAIL_MAX_LENGTH:
-        raise ValueError(
-            f"Email muito longo (máximo {constants.EMAIL_MAX_LENGTH} caracteres)"
-        )
+    if len(email) > _EMAIL_MAX:
+        raise ValueError(f"Email muito longo (máximo {_EMAIL_MAX} caracteres)")
 
     if "@" not in email or "." not in email:
         raise ValueError(constants.MSG_EMAIL_NAO_VALIDO)
@@ -132,12 +143,9 @@ def validar_numero_aula(numero_aula: Optional[int]) -> Optional[int]:
     if not isinstance(numero_aula, int):
         raise ValueError("Número de aula deve ser inteiro")
 
-    if (
-        numero_aula < constants.NUMERO_AULA_MIN
-        or numero_aula > constants.NUMERO_AULA_MAX
-    ):
+    if numero_aula < _NUMERO_AULA_MIN or numero_aula > _NUMERO_AULA_MAX:
         raise ValueError(
-            f"Número de aula deve estar entre {constants.NUMERO_AULA_MIN} e {constants.NUMERO_AULA_MAX}"
+            f"Número de aula deve estar entre {_NUMERO_AULA_MIN} e {_NUMERO_AULA_MAX}"
         )
 
     return numero_aula
@@ -162,9 +170,9 @@ def validar_dia_semana(dia_semana: int) -> int:
     if not isinstance(dia_semana, int):
         raise ValueError("Dia da semana deve ser inteiro")
 
-    if dia_semana < constants.DIA_SEMANA_MIN or dia_semana > constants.DIA_SEMANA_MAX:
+    if dia_semana < _DIA_SEMANA_MIN or dia_semana > _DIA_SEMANA_MAX:
         raise ValueError(
-            f"Dia da semana deve estar entre {constants.DIA_SEMANA_MIN} (segunda) e {constants.DIA_SEMANA_MAX} (sábado)"
+            f"Dia da semana deve estar entre {_DIA_SEMANA_MIN} (segunda) e {_DIA_SEMANA_MAX} (sábado)"
         )
 
     return dia_semana
@@ -192,10 +200,8 @@ def validar_bimestre(bimestre: Optional[int]) -> Optional[int]:
     if not isinstance(bimestre, int):
         raise ValueError("Bimestre deve ser inteiro")
 
-    if bimestre < constants.BIMESTRE_MIN or bimestre > constants.BIMESTRE_MAX:
-        raise ValueError(
-            f"Bimestre deve estar entre {constants.BIMESTRE_MIN} e {constants.BIMESTRE_MAX}"
-        )
+    if bimestre < _BIMESTRE_MIN or bimestre > _BIMESTRE_MAX:
+        raise ValueError(f"Bimestre deve estar entre {_BIMESTRE_MIN} e {_BIMESTRE_MAX}")
 
     return bimestre
 
@@ -222,10 +228,8 @@ def validar_modulo(modulo: Optional[int]) -> Optional[int]:
     if not isinstance(modulo, int):
         raise ValueError("Módulo deve ser inteiro")
 
-    if modulo < constants.MODULO_MIN or modulo > constants.MODULO_MAX:
-        raise ValueError(
-            f"Módulo deve estar entre {constants.MODULO_MIN} e {constants.MODULO_MAX}"
-        )
+    if modulo < _MODULO_MIN or modulo > _MODULO_MAX:
+        raise ValueError(f"Módulo deve estar entre {_MODULO_MIN} e {_MODULO_MAX}")
 
     return modulo
 
@@ -6,11 +6,12 @@ incluindo: cliente de teste, banco de dados, usuários de teste, e tokens JWT.
 """
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from datetime import datetime
 
+from app import cache
 from app.database import Base, get_db
 from app.main import app
 from app.models import Usuario, Instituicao, Curso, TipoData
@@ -46,7 +47,7 @@ def db_session(db_engine):
     """
     connection = db_engine.connect()
     transaction = connection.begin()
-    session = sessionmaker(bind=connection)()
+    session = sessionmaker(bind=connection, autoflush=False, expire_on_commit=False)()
 
     yield session
 
@@ -70,6 +71,33 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def contar_queries(db_engine):
+    """
+    Contar os comandos SQL executados durante o teste.
+    Retorna uma lista com o SQL de cada comando; use `len()` para o total.
+    Requisições autenticadas começam pelo SELECT do RA (`crud.obter_ra_usuario`).
+    """
+    queries = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", registrar)
+    yield queries
+    event.remove(db_engine, "before_cursor_execute", registrar)
+
+
+@pytest.fixture(autouse=True)
+def limpar_caches():
+    """
+    Esvaziar caches em memória antes de cada teste.
+    Os IDs são reutilizados após o rollback, então snapshots antigos não podem vazar.
+    """
+    cache.limpar_caches()
+    yield
+
+
 # ============================================================================
 # DADOS DE TESTE - INSTITUIÇÕES
 # ============================================================================
@@ -2,6 +2,12 @@
 Testes para o router de Anotações.
 """
 
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app import crud
+from app.auth import criar_access_token
+
 
 class TestCriarAnotacao:
     """Testes de endpoint POST /api/v1/anotacao/"""
@@ -25,6 +31,59 @@ class TestCriarAnotacao:
         assert data["anotacao"] == dados_anotacao["anotacao"]
         assert data["ra"] == usuario_teste.ra
 
+    def test_criar_anotacao_sem_select_apos_insert(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve obter id e data do próprio INSERT ... RETURNING, sem SELECT extra"""
+        response = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação", "anotacao": "Conteúdo"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 201
+        assert response.json()["data"]["dt_anotacao"] is not None
+        assert len(contar_queries) == 2
+        assert "RETURNING" in contar_queries[-1]
+
+
+class TestCriarAnotacoesEmLote:
+    """Testes de endpoint POST /api/v1/anotacao/lote"""
+
+    def test_criar_anotacoes_em_lote_com_sucesso(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve criar todas as anotações e retornar os IDs na ordem enviada"""
+        response = client.post(
+            "/api/v1/anotacao/lote",
+            json=[
+                {"titulo": f"Anotação {i}", "anotacao": "Conteúdo"} for i in range(3)
+            ],
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 201
+        ids = response.json()["data"]
+        assert len(ids) == 3
+
+        listagem = client.get("/api/v1/anotacao/", headers=headers_autenticado).json()
+        assert [a["id_anotacao"] for a in listagem["data"]] == ids
+        assert [a["titulo"] for a in listagem["data"]] == [
+            "Anotação 0",
+            "Anotação 1",
+            "Anotação 2",
+        ]
+
+    def test_criar_anotacoes_em_lote_vazio(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 422 se a lista estiver vazia"""
+        response = client.post(
+            "/api/v1/anotacao/lote", json=[], headers=headers_autenticado
+        )
+
+        assert response.status_code == 422
+
 
 class TestListarAnotacoes:
     """Testes de endpoint GET /api/v1/anotacao/"""
@@ -44,6 +103,143 @@ class TestListarAnotacoes:
         data = response.json()
         assert isinstance(data["data"], list)
 
+    def test_listar_anotacoes_formato_resposta(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve manter o formato de GenericListResponse (serializado sem Pydantic)"""
+        client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+
+        response = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+
+        data = response.json()
+        assert set(data) == {
+            "data",
+            "success",
+            "message",
+            "total",
+            "skip",
+            "limit",
+            "next_cursor",
+        }
+        assert set(data["data"][0]) == {
+            "id_anotacao",
+            "ra",
+            "titulo",
+            "anotacao",
+            "dt_anotacao",
+        }
+        assert data["data"][0]["ra"] == usuario_teste.ra
+        assert response.headers["etag"]
+
+    def test_listar_anotacoes_paginacao_keyset(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve paginar por after_id usando o next_cursor da página anterior"""
+        ids = []
+        for i in range(3):
+            response = client.post(
+                "/api/v1/anotacao/",
+                json={"titulo": f"Anotação {i}", "anotacao": "Conteúdo"},
+                headers=headers_autenticado,
+            )
+            ids.append(response.json()["data"]["id_anotacao"])
+
+        pagina_1 = client.get(
+            "/api/v1/anotacao/?limit=2", headers=headers_autenticado
+        ).json()
+        assert [a["id_anotacao"] for a in pagina_1["data"]] == ids[:2]
+        assert pagina_1["next_cursor"] == ids[1]
+
+        pagina_2 = client.get(
+            f"/api/v1/anotacao/?limit=2&after_id={pagina_1['next_cursor']}",
+            headers=headers_autenticado,
+        ).json()
+        assert [a["id_anotacao"] for a in pagina_2["data"]] == ids[2:]
+        assert pagina_2["next_cursor"] is None
+
+    def test_listar_anotacoes_keyset_sem_funcao_de_janela(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar a página keyset direto pelo índice, sem COUNT(*) OVER ()"""
+        for i in range(3):
+            client.post(
+                "/api/v1/anotacao/",
+                json={"titulo": f"Anotação {i}", "anotacao": "Conteúdo"},
+                headers=headers_autenticado,
+            )
+        contar_queries.clear()
+
+        response = client.get(
+            "/api/v1/anotacao/?limit=2&after_id=0", headers=headers_autenticado
+        )
+
+        assert response.json()["total"] == 3
+        assert not any(" OVER " in sql for sql in contar_queries)
+
+    def test_listar_anotacoes_numero_de_queries(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve listar com no máximo 2 queries (usuário + página com total)"""
+        for i in range(3):
+            client.post(
+                "/api/v1/anotacao/",
+                json={"titulo": f"Anotação {i}", "anotacao": "Conteúdo"},
+                headers=headers_autenticado,
+            )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 3
+        assert len(contar_queries) <= 2
+
+    def test_listar_anotacoes_autenticacao_le_so_o_ra(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve autenticar lendo só o RA do usuário, sem carregar a linha inteira"""
+        response = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        consultas_usuario = [sql for sql in contar_queries if "FROM usuario" in sql]
+        assert len(consultas_usuario) == 1
+        assert consultas_usuario[0].startswith("SELECT usuario.ra ")
+
+    def test_listar_anotacoes_etag(self, client, usuario_teste, headers_autenticado):
+        """Deve responder 304 com o mesmo ETag e mudar o ETag após alteração"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+
+        response = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+        etag = response.headers["etag"]
+
+        response = client.get(
+            "/api/v1/anotacao/",
+            headers={**headers_autenticado, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+        client.patch(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"titulo": "Novo Título"},
+            headers=headers_autenticado,
+        )
+        response = client.get(
+            "/api/v1/anotacao/",
+            headers={**headers_autenticado, "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
 
 class TestObterAnotacao:
     """Testes de endpoint GET /api/v1/anotacao/{id_anotacao}"""
@@ -65,6 +261,51 @@ class TestObterAnotacao:
         assert response.status_code == 200
         assert response.json()["data"]["id_anotacao"] == id_anotacao
 
+    def test_obter_anotacao_repetida_sem_select(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve servir a segunda leitura do snapshot em cache, sem SELECT"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        client.get(f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado)
+        contar_queries.clear()
+
+        response = client.get(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["titulo"] == "Anotação 1"
+        assert not any("FROM anotacao" in sql for sql in contar_queries)
+
+    def test_obter_anotacao_apos_atualizacao(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve refletir a atualização mesmo com a anotação já em cache"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        client.get(f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado)
+
+        response_patch = client.patch(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"titulo": "Novo Título"},
+            headers=headers_autenticado,
+        )
+        response = client.get(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+
+        assert response_patch.json()["data"]["titulo"] == "Novo Título"
+        assert response.json()["data"]["titulo"] == "Novo Título"
+
     def test_obter_anotacao_outro_usuario(
         self,
         client,
@@ -113,6 +354,28 @@ class TestAtualizarAnotacao:
         assert response.status_code == 200
         assert response.json()["data"]["titulo"] == "Anotação Atualizada"
 
+    def test_atualizar_anotacao_completa_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve atualizar (PUT) com um único UPDATE, sem SELECT de posse"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        contar_queries.clear()
+
+        response = client.put(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"titulo": "Novo Título", "anotacao": "Novo conteúdo"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert len(contar_queries) == 2
+        assert contar_queries[-1].startswith("UPDATE")
+
     def test_atualizar_anotacao_parcial(
         self, client, usuario_teste, headers_autenticado
     ):
@@ -133,6 +396,118 @@ class TestAtualizarAnotacao:
         assert response.status_code == 200
         assert response.json()["data"]["titulo"] == "Novo Título"
 
+    def test_atualizar_anotacao_parcial_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve atualizar com um único UPDATE ... RETURNING, sem SELECT prévio"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        contar_queries.clear()
+
+        response = client.patch(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"anotacao": "Novo conteúdo"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["titulo"] == "Anotação 1"
+        assert response.json()["data"]["anotacao"] == "Novo conteúdo"
+        assert len(contar_queries) == 2
+        assert contar_queries[-1].startswith("UPDATE")
+
+    def test_atualizar_anotacao_parcial_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 (alheia) ou 404 (inexistente) sem alterar nada"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+
+        response_alheia = client.patch(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"titulo": "Invasor"},
+            headers=headers_autenticado_usuario_2,
+        )
+        response_inexistente = client.patch(
+            "/api/v1/anotacao/9999",
+            json={"titulo": "Invasor"},
+            headers=headers_autenticado,
+        )
+        response_get = client.get(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+
+        assert response_alheia.status_code == 403
+        assert response_inexistente.status_code == 404
+        assert response_get.json()["data"]["titulo"] == "Anotação 1"
+
+    def test_atualizar_anotacao_parcial_campo_nulo(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 400 sem expor o SQL ao anular um campo obrigatório"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+
+        response = client.patch(
+            f"/api/v1/anotacao/{id_anotacao}",
+            json={"titulo": None},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 400
+        assert "anotacao" not in response.json()["detail"].lower()
+
+    def test_atualizar_anotacao_parcial_banco_indisponivel(
+        self, client, usuario_teste, headers_autenticado, monkeypatch
+    ):
+        """Deve retornar 503 quando o banco falha operacionalmente"""
+
+        def falhar(*args, **kwargs):
+            raise OperationalError("UPDATE anotacao", {}, Exception("down"))
+
+        monkeypatch.setattr(crud, "atualizar_anotacao_parcial", falhar)
+
+        response = client.patch(
+            "/api/v1/anotacao/1", json={"titulo": "X"}, headers=headers_autenticado
+        )
+
+        assert response.status_code == 503
+        assert "UPDATE" not in response.json()["detail"]
+
+    def test_atualizar_anotacao_parcial_erro_inesperado_do_banco(
+        self, client, usuario_teste, headers_autenticado, monkeypatch
+    ):
+        """Deve propagar como 500 erros do banco que não são de conexão"""
+
+        def falhar(*args, **kwargs):
+            raise ProgrammingError("UPDATE anotacao", {}, Exception("bug"))
+
+        monkeypatch.setattr(crud, "atualizar_anotacao_parcial", falhar)
+        cliente = TestClient(client.app, raise_server_exceptions=False)
+
+        response = cliente.patch(
+            "/api/v1/anotacao/1", json={"titulo": "X"}, headers=headers_autenticado
+        )
+
+        assert response.status_code == 500
+
 
 class TestDeletarAnotacao:
     """Testes de endpoint DELETE /api/v1/anotacao/{id_anotacao}"""
@@ -152,3 +527,49 @@ class TestDeletarAnotacao:
         )
 
         assert response.status_code == 200
+
+    def test_deletar_anotacao_remove_registro(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 404 ao buscar ou deletar novamente a anotação removida"""
+        dados_anotacao = {"titulo": "Anotação 1", "anotacao": "Conteúdo 1"}
+        response_criacao = client.post(
+            "/api/v1/anotacao/", json=dados_anotacao, headers=headers_autenticado
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        client.delete(f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado)
+
+        response_get = client.get(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+        response_delete = client.delete(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+
+        assert response_get.status_code == 404
+        assert response_delete.status_code == 404
+
+    def test_deletar_anotacao_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 e manter a anotação ao deletar a de outro usuário"""
+        dados_anotacao = {"titulo": "Anotação do Usuário 1", "anotacao": "Conteúdo"}
+        response_criacao = client.post(
+            "/api/v1/anotacao/", json=dados_anotacao, headers=headers_autenticado
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+
+        response = client.delete(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado_usuario_2
+        )
+        response_get = client.get(
+            f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado
+        )
+
+        assert response.status_code == 403
+        assert response_get.status_code == 200
@@ -70,6 +70,96 @@ class TestListarEventos:
         assert isinstance(data["data"], list)
         assert data["total"] >= 1
 
+    def test_listar_eventos_formato_resposta(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve manter o formato de GenericListResponse (serializado sem Pydantic)"""
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+
+        response = client.get("/api/v1/calendario/", headers=headers_autenticado)
+
+        data = response.json()
+        assert data["next_cursor"] is None
+        assert data["data"][0] == {
+            "id_data_evento": data["data"][0]["id_data_evento"],
+            "ra": usuario_teste.ra,
+            "data_evento": "2024-12-25",
+            "id_tipo_data": 1,
+        }
+
+    def test_listar_eventos_nao_modificado(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve responder 304 ao reenviar o ETag e 200 depois de uma escrita"""
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-24", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        etag = client.get("/api/v1/calendario/", headers=headers_autenticado).headers[
+            "etag"
+        ]
+        headers_condicionais = {**headers_autenticado, "If-None-Match": etag}
+
+        response = client.get("/api/v1/calendario/", headers=headers_condicionais)
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        response = client.get("/api/v1/calendario/", headers=headers_condicionais)
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_listar_eventos_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar página, total e versão em uma única query"""
+        for dia in ("2024-12-24", "2024-12-25"):
+            client.post(
+                "/api/v1/calendario/",
+                json={"data_evento": dia, "id_tipo_data": 1},
+                headers=headers_autenticado,
+            )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/calendario/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+        assert len(contar_queries) == 2
+
+    def test_listar_eventos_reflete_escrita(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve refletir uma escrita na listagem seguinte (sem resposta em cache)"""
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-24", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        response = client.get("/api/v1/calendario/", headers=headers_autenticado)
+        etag = response.headers["etag"]
+
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        response = client.get("/api/v1/calendario/", headers=headers_autenticado)
+
+        assert response.json()["total"] == 2
+        assert response.headers["etag"] != etag
+
 
 class TestObterEvento:
     """Testes de endpoint GET /api/v1/calendario/{id_data_evento}"""
@@ -88,6 +178,32 @@ class TestObterEvento:
 
         assert response.status_code == 200
 
+    def test_obter_evento_formato_resposta(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve manter o formato de GenericResponse ao serializar direto da linha"""
+        response_criacao = client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+
+        response = client.get(
+            f"/api/v1/calendario/{id_evento}", headers=headers_autenticado
+        )
+
+        assert response.json() == {
+            "data": {
+                "id_data_evento": id_evento,
+                "ra": usuario_teste.ra,
+                "data_evento": "2024-12-25",
+                "id_tipo_data": 1,
+            },
+            "success": True,
+            "message": None,
+        }
+
     def test_obter_evento_outro_usuario(
         self,
         client,
@@ -152,6 +268,32 @@ class TestListarEventosPorTipo:
 
         assert response.status_code == 200
 
+    def test_listar_eventos_por_tipo_sem_eventos(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 404 citando o nome do tipo se não há eventos dele"""
+        response = client.get("/api/v1/calendario/tipo/2", headers=headers_autenticado)
+
+        assert response.status_code == 404
+        assert "'Não Letivo'" in response.json()["detail"]
+
+    def test_listar_eventos_por_tipo_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar página e total em uma única query (tipo já em cache)"""
+        client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/calendario/tipo/1", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+        assert len(contar_queries) == 2
+
 
 class TestAtualizarEvento:
     """Testes de endpoints PUT/PATCH /api/v1/calendario/{id_data_evento}"""
@@ -192,6 +334,108 @@ class TestAtualizarEvento:
 
         assert response.status_code == 200
 
+    def test_atualizar_evento_data_duplicada(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 409 ao mover o evento para uma data já ocupada (PATCH)"""
+        for dia in ("2024-12-25", "2024-12-26"):
+            response_criacao = client.post(
+                "/api/v1/calendario/",
+                json={"data_evento": dia, "id_tipo_data": 1},
+                headers=headers_autenticado,
+            )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+
+        response = client.patch(
+            f"/api/v1/calendario/{id_evento}",
+            json={"data_evento": "2024-12-25"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 409
+
+    def test_atualizar_evento_campos_nulos(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve ignorar campos enviados como null em vez de responder 409 (PATCH)"""
+        response_criacao = client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+
+        respostas = [
+            client.patch(
+                f"/api/v1/calendario/{id_evento}",
+                json=dados,
+                headers=headers_autenticado,
+            )
+            for dados in ({"id_tipo_data": None}, {"data_evento": None})
+        ]
+
+        for response in respostas:
+            assert response.status_code == 200
+            assert response.json()["data"]["data_evento"] == "2024-12-25"
+            assert response.json()["data"]["id_tipo_data"] == 1
+
+    def test_atualizar_evento_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve validar a posse no próprio UPDATE, sem SELECT prévio do evento"""
+        response_criacao = client.post(
+            "/api/v1/calendario/",
+            json={"data_evento": "2024-12-25", "id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+        contar_queries.clear()
+
+        response = client.patch(
+            f"/api/v1/calendario/{id_evento}",
+            json={"id_tipo_data": 1},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert len(contar_queries) == 2
+        assert contar_queries[-1].startswith("UPDATE")
+
+    def test_atualizar_evento_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 se o evento pertence a outro usuário (PUT)"""
+        dados_evento = {"data_evento": "2024-12-25", "id_tipo_data": 1}
+        response_criacao = client.post(
+            "/api/v1/calendario/", json=dados_evento, headers=headers_autenticado
+        )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+
+        response = client.put(
+            f"/api/v1/calendario/{id_evento}",
+            json={"data_evento": "2024-12-30", "id_tipo_data": 2},
+            headers=headers_autenticado_usuario_2,
+        )
+
+        assert response.status_code == 403
+
+    def test_atualizar_evento_inexistente(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 404 se o evento não existe (PATCH)"""
+        response = client.patch(
+            "/api/v1/calendario/9999",
+            json={"id_tipo_data": 2},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 404
+
 
 class TestDeletarEvento:
     """Testes de endpoint DELETE /api/v1/calendario/{id_data_evento}"""
@@ -211,3 +455,36 @@ class TestDeletarEvento:
         )
 
         assert response.status_code == 200
+
+    def test_deletar_evento_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 e manter o evento se ele pertence a outro usuário"""
+        dados_evento = {"data_evento": "2024-12-25", "id_tipo_data": 1}
+        response_criacao = client.post(
+            "/api/v1/calendario/", json=dados_evento, headers=headers_autenticado
+        )
+        id_evento = response_criacao.json()["data"]["id_data_evento"]
+
+        response = client.delete(
+            f"/api/v1/calendario/{id_evento}", headers=headers_autenticado_usuario_2
+        )
+
+        assert response.status_code == 403
+        response = client.get(
+            f"/api/v1/calendario/{id_evento}", headers=headers_autenticado
+        )
+        assert response.status_code == 200
+
+    def test_deletar_evento_inexistente(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar 404 se o evento não existe"""
+        response = client.delete("/api/v1/calendario/9999", headers=headers_autenticado)
+
+        assert response.status_code == 404
@@ -88,6 +88,95 @@ class TestListarDiscentes:
         data = response.json()
         assert isinstance(data["data"], list)
 
+    def test_listar_discentes_campos(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve devolver os campos do discente lidos só das colunas da tabela"""
+        client.post(
+            "/api/v1/discentes/",
+            json={"nome": "João Discente", "email": "discente@example.com"},
+            headers=headers_autenticado,
+        )
+
+        response = client.get("/api/v1/discentes/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        discente = response.json()["data"][0]
+        assert discente["nome"] == "João Discente"
+        assert discente["email"] == "discente@example.com"
+        assert discente["ra"] == usuario_teste.ra
+
+    def test_listar_discentes_em_uma_query(
+        self, client: TestClient, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar página e total em uma única query"""
+        client.post(
+            "/api/v1/discentes/",
+            json={"nome": "João Discente", "email": "discente@example.com"},
+            headers=headers_autenticado,
+        )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/discentes/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+        assert len(contar_queries) == 2
+
+    def test_listar_discentes_com_curso_sem_n_mais_1(
+        self,
+        client: TestClient,
+        usuario_teste,
+        curso_teste,
+        headers_autenticado,
+        contar_queries,
+    ):
+        """Deve listar discentes com curso sem consultar a tabela de cursos"""
+        for i in range(3):
+            client.post(
+                "/api/v1/discentes/",
+                json={
+                    "nome": f"Discente {i}",
+                    "email": f"discente{i}@example.com",
+                    "id_curso": curso_teste.id_curso,
+                },
+                headers=headers_autenticado,
+            )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/discentes/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert all(
+            d["id_curso"] == curso_teste.id_curso for d in response.json()["data"]
+        )
+        assert len(contar_queries) == 2
+        assert not any("FROM curso" in sql for sql in contar_queries)
+
+    def test_listar_discentes_keyset(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve paginar por after_id seguindo o next_cursor"""
+        for i in range(3):
+            client.post(
+                "/api/v1/discentes/",
+                json={"nome": f"Discente {i}", "email": f"discente{i}@example.com"},
+                headers=headers_autenticado,
+            )
+
+        pagina_1 = client.get(
+            "/api/v1/discentes/?limit=2", headers=headers_autenticado
+        ).json()
+        pagina_2 = client.get(
+            f"/api/v1/discentes/?limit=2&after_id={pagina_1['next_cursor']}",
+            headers=headers_autenticado,
+        ).json()
+
+        assert [d["nome"] for d in pagina_1["data"]] == ["Discente 0", "Discente 1"]
+        assert [d["nome"] for d in pagina_2["data"]] == ["Discente 2"]
+        assert pagina_2["total"] == 3
+        assert pagina_2["next_cursor"] is None
+
     def test_listar_discentes_sem_autenticacao(self, client: TestClient):
         """Deve retornar 401 sem token"""
         response = client.get("/api/v1/discentes/")
@@ -179,6 +268,26 @@ class TestAtualizarDiscente:
         data = response.json()["data"]
         assert data["nome"] == "João Discente Atualizado"
 
+    def test_atualizar_discente_mesmo_email(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve aceitar reenviar o próprio email (não conta como duplicado)"""
+        response_criacao = client.post(
+            "/api/v1/discentes/",
+            json={"nome": "João Discente", "email": "discente@example.com"},
+            headers=headers_autenticado,
+        )
+        id_discente = response_criacao.json()["data"]["id_discente"]
+
+        response = client.patch(
+            f"/api/v1/discentes/{id_discente}",
+            json={"nome": "João Renomeado", "email": "discente@example.com"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["nome"] == "João Renomeado"
+
     def test_atualizar_discente_parcial(
         self, client: TestClient, usuario_teste, headers_autenticado
     ):
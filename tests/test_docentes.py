@@ -71,6 +71,45 @@ class TestListarDocentes:
         data = response.json()
         assert isinstance(data["data"], list)
 
+    def test_listar_docentes_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar página e total em uma única query"""
+        client.post(
+            "/api/v1/docentes/",
+            json={"nome": "Prof. João", "email": "prof.joao@example.com"},
+            headers=headers_autenticado,
+        )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/docentes/", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+        assert len(contar_queries) == 2
+
+    def test_listar_docentes_keyset(self, client, usuario_teste, headers_autenticado):
+        """Deve paginar por after_id seguindo o next_cursor"""
+        for i in range(3):
+            client.post(
+                "/api/v1/docentes/",
+                json={"nome": f"Prof. {i}", "email": f"prof{i}@example.com"},
+                headers=headers_autenticado,
+            )
+
+        pagina_1 = client.get(
+            "/api/v1/docentes/?limit=2", headers=headers_autenticado
+        ).json()
+        pagina_2 = client.get(
+            f"/api/v1/docentes/?limit=2&after_id={pagina_1['next_cursor']}",
+            headers=headers_autenticado,
+        ).json()
+
+        assert [d["nome"] for d in pagina_1["data"]] == ["Prof. 0", "Prof. 1"]
+        assert [d["nome"] for d in pagina_2["data"]] == ["Prof. 2"]
+        assert pagina_2["total"] == 3
+        assert pagina_2["next_cursor"] is None
+
 
 class TestObterDocente:
     """Testes de endpoint GET /api/v1/docentes/{id_docente}"""
@@ -147,6 +186,46 @@ class TestAtualizarDocente:
         assert response.status_code == 200
         assert response.json()["data"]["nome"] == "Prof. João Atualizado"
 
+    def test_atualizar_docente_valida_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve validar posse e email em uma query e atualizar em outra (PUT)"""
+        dados_docente = {"nome": "Prof. João", "email": "prof.joao@example.com"}
+        response_criacao = client.post(
+            "/api/v1/docentes/", json=dados_docente, headers=headers_autenticado
+        )
+        id_docente = response_criacao.json()["data"]["id_docente"]
+        contar_queries.clear()
+
+        response = client.put(
+            f"/api/v1/docentes/{id_docente}",
+            json={**dados_docente, "nome": "Prof. João Silva"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert len(contar_queries) == 3
+
+    def test_atualizar_docente_email_de_outro(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve rejeitar o email já usado por outro docente (PUT)"""
+        for email in ("prof.a@example.com", "prof.b@example.com"):
+            response_criacao = client.post(
+                "/api/v1/docentes/",
+                json={"nome": "Prof. Teste", "email": email},
+                headers=headers_autenticado,
+            )
+        id_docente = response_criacao.json()["data"]["id_docente"]
+
+        response = client.put(
+            f"/api/v1/docentes/{id_docente}",
+            json={"nome": "Prof. Teste", "email": "prof.a@example.com"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 400
+
     def test_atualizar_docente_parcial(
         self, client, usuario_teste, headers_autenticado
     ):
@@ -14,3 +14,31 @@ class TestHealthCheck:
         data = response.json()
         assert data["status"] == "healthy"
         assert "version" in data
+        assert "cache" not in data
+
+    def test_health_check_estatisticas_cache(
+        self, client, usuario_teste, headers_autenticado
+    ):
+        """Deve contar acertos e faltas do cache de anotações"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        for _ in range(2):
+            client.get(f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado)
+
+        response = client.get("/api/v1/health/cache", headers=headers_autenticado)
+
+        assert response.json()["anotacao"] == {
+            "acertos": 1,
+            "faltas": 1,
+            "taxa_acerto": 0.5,
+        }
+
+    def test_estatisticas_cache_sem_autenticacao(self, client):
+        """Deve exigir token para expor as estatísticas de cache"""
+        response = client.get("/api/v1/health/cache")
+
+        assert response.status_code == 403
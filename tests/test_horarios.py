@@ -109,6 +109,24 @@ class TestListarHorariosPorDia:
 
         assert response.status_code == 200
 
+    def test_listar_horarios_por_dia_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve buscar página e total em uma única query"""
+        for numero_aula in (1, 2):
+            client.post(
+                "/api/v1/horario/",
+                json={"dia_semana": 2, "numero_aula": numero_aula},
+                headers=headers_autenticado,
+            )
+        contar_queries.clear()
+
+        response = client.get("/api/v1/horario/dia/2", headers=headers_autenticado)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+        assert len(contar_queries) == 2
+
 
 class TestAtualizarHorario:
     """Testes de endpoints PUT/PATCH /api/v1/horario/{id_horario}"""
@@ -162,6 +180,53 @@ class TestAtualizarHorario:
         assert response.status_code == 200
         assert response.json()["data"]["dia_semana"] == 3
 
+    def test_atualizar_horario_em_uma_query(
+        self, client, usuario_teste, headers_autenticado, contar_queries
+    ):
+        """Deve validar a posse no próprio UPDATE, sem SELECT prévio do horário"""
+        response_criacao = client.post(
+            "/api/v1/horario/",
+            json={"dia_semana": 1, "numero_aula": 1},
+            headers=headers_autenticado,
+        )
+        id_horario = response_criacao.json()["data"]["id_horario"]
+        contar_queries.clear()
+
+        response = client.patch(
+            f"/api/v1/horario/{id_horario}",
+            json={"disciplina": "Banco de Dados"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["disciplina"] == "Banco de Dados"
+        assert len(contar_queries) == 2
+        assert contar_queries[-1].startswith("UPDATE")
+
+    def test_atualizar_horario_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 ao atualizar horário de outro usuário (PUT)"""
+        response_criacao = client.post(
+            "/api/v1/horario/",
+            json={"dia_semana": 1, "numero_aula": 1},
+            headers=headers_autenticado,
+        )
+        id_horario = response_criacao.json()["data"]["id_horario"]
+
+        response = client.put(
+            f"/api/v1/horario/{id_horario}",
+            json={"dia_semana": 2},
+            headers=headers_autenticado_usuario_2,
+        )
+
+        assert response.status_code == 403
+
 
 class TestDeletarHorario:
     """Testes de endpoint DELETE /api/v1/horario/{id_horario}"""
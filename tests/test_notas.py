@@ -124,6 +124,30 @@ class TestAtualizarNota:
         assert response.status_code == 200
         assert response.json()["data"]["nota"] == "9.5"
 
+    def test_atualizar_nota_outro_usuario(
+        self,
+        client,
+        usuario_teste,
+        usuario_teste_2,
+        headers_autenticado,
+        headers_autenticado_usuario_2,
+    ):
+        """Deve retornar 403 ao atualizar nota de outro usuário (PUT)"""
+        response_criacao = client.post(
+            "/api/v1/notas/",
+            json={"nota": "8.5", "bimestre": 1},
+            headers=headers_autenticado,
+        )
+        id_nota = response_criacao.json()["data"]["id_nota"]
+
+        response = client.put(
+            f"/api/v1/notas/{id_nota}",
+            json={"nota": "10.0"},
+            headers=headers_autenticado_usuario_2,
+        )
+
+        assert response.status_code == 403
+
 
 class TestDeletarNota:
     """Testes de endpoint DELETE /api/v1/notas/{id_nota}"""
@@ -144,3 +168,9 @@ class TestDeletarNota:
         )
 
         assert response.status_code == 200
+
+    def test_deletar_nota_inexistente(self, client, usuario_teste, headers_autenticado):
+        """Deve retornar 404 ao deletar nota que não existe"""
+        response = client.delete("/api/v1/notas/9999", headers=headers_autenticado)
+
+        assert response.status_code == 404
@@ -5,8 +5,13 @@ Testes abrangentes para autenticação (login, refresh) e CRUD de usuários
 (criar, listar, obter, atualizar, deletar).
 """
 
+from datetime import timedelta
+
 from fastapi.testclient import TestClient
 
+from app import cache
+from app.auth import criar_access_token, criar_refresh_token
+
 
 class TestLogin:
     """Testes de endpoint POST /api/v1/usuario/login"""
@@ -70,6 +75,29 @@ class TestRefreshToken:
 
         assert response.status_code == 401
 
+    def test_refresh_token_sem_id_usuario(self, client: TestClient):
+        """Deve retornar 401 se o refresh_token não tem a claim id_usuario"""
+        response = client.post(
+            "/api/v1/usuario/refresh",
+            json={"refresh_token": criar_refresh_token(data={})},
+        )
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token inválido"
+
+    def test_refresh_token_assinatura_adulterada(
+        self, client: TestClient, refresh_token_usuario_teste
+    ):
+        """Deve retornar 401 se a assinatura do refresh_token foi alterada"""
+        header, payload, assinatura = refresh_token_usuario_teste.split(".")
+        adulterado = f"{header}.{payload}.{assinatura[::-1]}"
+
+        response = client.post(
+            "/api/v1/usuario/refresh", json={"refresh_token": adulterado}
+        )
+
+        assert response.status_code == 401
+
 
 class TestCriarUsuario:
     """Testes de endpoint POST /api/v1/usuario/"""
@@ -188,6 +216,19 @@ class TestObterPerfil:
         assert data["id_usuario"] == usuario_teste.id_usuario
         assert data["ra"] == usuario_teste.ra
 
+    def test_obter_perfil_token_expirado(self, client: TestClient, usuario_teste):
+        """Deve retornar 401 com access_token expirado"""
+        token = criar_access_token(
+            data={"id_usuario": usuario_teste.id_usuario},
+            expires_delta=timedelta(minutes=-1),
+        )
+
+        response = client.get(
+            "/api/v1/usuario/me", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 401
+
     def test_obter_perfil_sem_autenticacao(self, client: TestClient):
         """Deve retornar 401 sem token"""
         response = client.get("/api/v1/usuario/me")
@@ -232,6 +273,38 @@ class TestAtualizarUsuario:
         data = response.json()["data"]
         assert data["nome"] == "João Novo Nome"
 
+    def test_atualizar_usuario_novo_curso(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve retornar o nome do novo curso logo após trocar de curso (PATCH)"""
+        assert usuario_teste.curso is not None
+
+        response = client.patch(
+            "/api/v1/usuario/",
+            json={"nome_curso": "Curso Recém-Criado"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["nome_curso"] == "Curso Recém-Criado"
+
+    def test_atualizar_usuario_mesma_senha(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve manter o login funcionando ao reenviar a senha atual (PATCH)"""
+        response = client.patch(
+            "/api/v1/usuario/",
+            json={"senha_hash": "SenhaForte@123"},
+            headers=headers_autenticado,
+        )
+
+        assert response.status_code == 200
+        response = client.post(
+            "/api/v1/usuario/login",
+            json={"username": "joao", "senha_hash": "SenhaForte@123"},
+        )
+        assert response.status_code == 200
+
     def test_atualizar_usuario_sem_autenticacao(self, client: TestClient):
         """Deve retornar 401 sem token"""
         response = client.put("/api/v1/usuario/", json={"nome": "Novo Nome"})
@@ -251,6 +324,35 @@ class TestDeletarUsuario:
         assert response.status_code == 200
         assert "deletado" in response.json()["message"].lower()
 
+    def test_deletar_usuario_descarta_anotacoes_em_cache(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve descartar os snapshots das anotações do usuário deletado"""
+        response_criacao = client.post(
+            "/api/v1/anotacao/",
+            json={"titulo": "Anotação 1", "anotacao": "Conteúdo 1"},
+            headers=headers_autenticado,
+        )
+        id_anotacao = response_criacao.json()["data"]["id_anotacao"]
+        client.get(f"/api/v1/anotacao/{id_anotacao}", headers=headers_autenticado)
+        assert id_anotacao in cache.anotacoes_cache
+
+        client.delete("/api/v1/usuario/", headers=headers_autenticado)
+
+        assert id_anotacao not in cache.anotacoes_cache
+
+    def test_deletar_usuario_invalida_token(
+        self, client: TestClient, usuario_teste, headers_autenticado
+    ):
+        """Deve rejeitar o token de um usuário deletado"""
+        response_antes = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+        assert response_antes.status_code == 200
+
+        client.delete("/api/v1/usuario/", headers=headers_autenticado)
+        response = client.get("/api/v1/anotacao/", headers=headers_autenticado)
+
+        assert response.status_code == 401
+
     def test_deletar_usuario_sem_autenticacao(self, client: TestClient):
         """Deve retornar 401 sem token"""
         response = client.delete("/api/v1/usuario/")